@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+"""
+Per-task benchmark of the oligo-finder command line tools.
+
+Runs every pipeline step on a small single-gene fixture, once with
+`oligo-finder <command>` and once with the former standalone `bin/` scripts
+taken from git history, and reports the median wall-clock time of each.
+
+Two times are reported per side. The import time only loads the code: the
+module-level imports of the bin/ script, or the oligo-finder command module
+with its arguments. It is what every one of the thousands of Nextflow tasks
+of a run pays before doing any work, and isolates the gain of the single
+entry point and deferred imports. The run time executes the command on the
+fixture. The difference is the work itself: there, a gain comes from the
+algorithm (e.g. generate loading its weight matrix and microRNA seeds once
+instead of once per window), and commands that need pandas or RNA pay for
+them on both sides.
+
+Usage:
+    python benchmarks/startup.py [--repeats N] [--length N] [--baseline_ref REF]
+"""
+
+import argparse
+import ast
+import json
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# Design parameters of the fixture, the pipeline defaults
+DESIGN = {
+    'surrounding_region_length': 45,
+    'offset_5_prime': 16,
+    'oligo_length': 20,
+    'offset_refseq_seed': 3,
+    'refseq_seed_length': 16,
+    'offset_microrna': 3,
+    'microrna_seed_length': 7,
+}
+
+ACCESSION = 'NM_000001.1'
+GENE_ID = 'NM_000001.1_benchmark'
+
+def default_baseline_ref():
+    """Returns the last commit that still had the standalone bin/ scripts."""
+    removed = subprocess.run(
+        ['git', 'log', '-1', '--format=%H', '--diff-filter=D', '--', 'bin/generate_sequences.py'],
+        cwd=REPO_DIR, capture_output=True, text=True
+    ).stdout.strip()
+    return f"{removed}^" if removed else None
+
+def extract_baseline_scripts(ref, bin_dir):
+    """Writes the bin/ scripts of a commit to bin_dir, returning False if they are not available."""
+    listing = subprocess.run(['git', 'ls-tree', '--name-only', ref, 'bin/'], cwd=REPO_DIR, capture_output=True, text=True)
+    if listing.returncode != 0 or not listing.stdout.strip():
+        return False
+    bin_dir.mkdir()
+    for name in listing.stdout.split():
+        content = subprocess.run(['git', 'show', f"{ref}:{name}"], cwd=REPO_DIR, capture_output=True).stdout
+        (bin_dir / Path(name).name).write_bytes(content)
+    return True
+
+def write_fixture(work, length):
+    """
+    Writes a random single-gene target FASTA with its reference files, run
+    metadata and a SAM file of its seeds.
+    """
+    random.seed(0)
+    sequence = ''.join(random.choice('ACGT') for _ in range(length))
+    with open(work / 'target.fa', 'w') as f:
+        f.write(f">{ACCESSION} benchmark\n")
+        for i in range(0, length, 70):
+            f.write(sequence[i:i + 70] + '\n')
+
+    with open(work / 'weight_matrix.txt', 'w') as f:
+        f.write('Position\tA\tC\tG\tU\n')
+        for position in range(1, DESIGN['surrounding_region_length'] + 1):
+            f.write(f"{position}\t" + '\t'.join(f"{random.uniform(-1, 1):.3f}" for _ in range(4)) + '\n')
+    with open(work / 'microrna_seeds.txt', 'w') as f:
+        for _ in range(200):
+            f.write(''.join(random.choice('ACGU') for _ in range(DESIGN['microrna_seed_length'])) + '\n')
+    with open(work / 'cds_region.txt', 'w') as f:
+        f.write(f"Accession\tStart\tEnd\n{ACCESSION}\t{length // 4}\t{3 * length // 4}\n")
+
+    with open(work / 'run_metadata.json', 'w') as f:
+        json.dump({'run_id': 'benchmark', 'sense_length': 14, 'antisense_length': 19}, f)
+
+    accessions = [ACCESSION] + [f"NM_{i:06d}.1" for i in range(2, 50)]
+    with open(work / 'geneid_acc.txt', 'w') as f:
+        f.write('GeneID\tSymbol\tAccession\n')
+        for i, accession in enumerate(accessions):
+            f.write(f"{i // 2 + 1}\tGENE{i // 2 + 1}\t{accession}\n")
+
+    # Every seed matches its own transcript, and a few others with mismatches
+    seed_start = DESIGN['offset_5_prime'] + DESIGN['offset_refseq_seed']
+    seed_length = DESIGN['refseq_seed_length']
+    with open(work / 'target.sam', 'w') as f:
+        f.write('@HD\tVN:1.0\tSO:unsorted\n')
+        for i in range(length - DESIGN['surrounding_region_length'] + 1):
+            seed = sequence[i + seed_start:i + seed_start + seed_length]
+            hits = [(ACCESSION, 0)] + [(random.choice(accessions[1:]), random.randint(1, 3)) for _ in range(3)]
+            for accession, mismatches in hits:
+                f.write(
+                    f"{GENE_ID}_{i + 1}\t0\t{accession}\t{random.randint(1, 5000)}\t255\t{seed_length}M\t*\t0\t0\t"
+                    f"{seed}\t{'I' * seed_length}\tXA:i:0\tMD:Z:{seed_length}\tNM:i:{mismatches}\n"
+                )
+
+def fixture_record(work):
+    """Returns the sequence offset and length of the fixture gene, as the pipeline passes them to its tasks."""
+    header, sequence = (work / 'target.fa').read_bytes().split(b'\n', 1)
+    return len(header) + 1, len(b''.join(sequence.split()))
+
+def design_args():
+    return [arg for name, value in DESIGN.items() for arg in (f"--{name}", str(value))]
+
+def build_steps(work, bin_dir):
+    """
+    Returns the (step, baseline command, oligo-finder command) of every
+    pipeline step, in pipeline order; either command is None when the step
+    does not exist on that side.
+    """
+    python = sys.executable
+    cli = [python, '-m', 'oligo_finder']
+    old = (lambda script, *args: [python, str(bin_dir / script), *args]) if bin_dir else (lambda *args: None)
+    w = lambda name: str(work / name)  # noqa: E731
+    offset, length = fixture_record(work)
+    record_args = ['--offset', str(offset), '--length', str(length)]
+    generate_inputs = [
+        '--weight_matrix', w('weight_matrix.txt'), '--microrna_seeds', w('microrna_seeds.txt'),
+        '--cds_region', w('cds_region.txt'),
+    ]
+    accessibility_args = [
+        '--winsize', '70', '--span', '45', '--ulength', '20',
+        '--surrounding_region_length', str(DESIGN['surrounding_region_length']),
+        '--oligo_length', str(DESIGN['oligo_length']), '--offset_5_prime', str(DESIGN['offset_5_prime']),
+    ]
+    return [
+        ('generate',
+         old('generate_sequences.py', '--input_fasta', w('target.fa'), '--gene_id', GENE_ID,
+             '--output', w('old.seqs.tsv'), *design_args(), *generate_inputs),
+         cli + ['generate', '--input_fasta', w('target.fa'), '--gene_id', GENE_ID, *record_args, '--accession', ACCESSION,
+                '--output', w('new.seqs.tsv.gz'), *design_args(), *generate_inputs]),
+        ('accessibility',
+         old('calculate_target_accessibility.py', '--gene_id', GENE_ID, '--input_fasta', w('target.fa'),
+             '--output', w('old.accessibility.tsv'), *accessibility_args),
+         cli + ['accessibility', '--gene_id', GENE_ID, '--input_fasta', w('target.fa'), *record_args,
+                '--output', w('new.accessibility.tsv.gz'), *accessibility_args]),
+        ('structure', None,
+         cli + ['structure', '--seqs', w('new.seqs.tsv.gz'), '--output', w('new.structure.tsv.gz')]),
+        ('parse SAM',
+         old('parse_sam.py', '--sam', w('target.sam'), '--output', w('old.json')),
+         cli + ['parse-sam', '--sam', w('target.sam'), '--output', w('new.json.gz'), '--geneid_accession', w('geneid_acc.txt')]),
+        ('crossreactivity',
+         old('generate_crossreactivity_report.py', '--json', w('old.json'), '--output', w('old.crossreactivity.tsv'),
+             '--geneid_accession', w('geneid_acc.txt')),
+         cli + ['crossreactivity', '--json', w('new.json.gz'), '--output', w('new.crossreactivity.tsv.gz')]),
+        ('merge',
+         old('merge_results.py', '--filtered_metadata', w('old.seqs.tsv'), '--crossreactivity_report', w('old.crossreactivity.tsv'),
+             '--target_accessibility', w('old.accessibility.tsv'), '--output', w('old.compete.tsv')),
+         cli + ['merge', '--filtered_metadata', w('new.seqs.tsv.gz'), '--crossreactivity_report', w('new.crossreactivity.tsv.gz'),
+                '--target_accessibility', w('new.accessibility.tsv.gz'), '--oligo_structure', w('new.structure.tsv.gz'),
+                '--output', w('new.compete.tsv.gz')]),
+        ('filter',
+         old('filter_sequences.py', '--seq_file', w('old.compete.tsv'), '--forbidden_motifs', 'GGG', '--output_file', w('old.filtered.tsv')),
+         cli + ['filter', '--seq_file', w('new.compete.tsv.gz'), '--forbidden_motifs', 'GGG', '--output_file', w('new.filtered.tsv.gz')]),
+        ('report',
+         old('generate_final_report.py', '--report_tsv', w('old.compete.tsv'), '--output_xlsx', w('old.final.xlsx')),
+         cli + ['report', '--report_tsv', w('new.compete.tsv.gz'), '--output_xlsx', w('new.final.xlsx')]),
+        ('lookup',
+         old('json_lookup.py', '--json', w('old.json'), '--id', f"{GENE_ID}_1", '--mismatch_level', '0'),
+         cli + ['lookup', '--json', w('new.json.gz'), '--id', f"{GENE_ID}_1", '--mismatch_level', '0']),
+        ('aggregate', None,
+         cli + ['aggregate', '--merged', w('new.compete.tsv.gz'), '--run_metadata', w('run_metadata.json'),
+                '--default_reference', 'human', '--output', w('results.sqlite')]),
+        ('query', None,
+         cli + ['query', '--db', w('results.sqlite'), '--per_gene', '10', '--output', w('query.tsv')]),
+        ('export', None,
+         cli + ['export', '--db', w('results.sqlite'), '--gene_id', GENE_ID, '--output_xlsx', w('export.xlsx')]),
+    ]
+
+def baseline_import_command(script_path):
+    """Returns a command running only the module-level imports of a bin/ script."""
+    tree = ast.parse(Path(script_path).read_text())
+    imports = [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    # The scripts import their helper modules from bin/
+    return [sys.executable, '-c', '\n'.join([f"import sys; sys.path.insert(0, {str(Path(script_path).parent)!r})", *imports])]
+
+def import_command(command):
+    """Returns a command loading an oligo-finder command module and its arguments, as the entry point does."""
+    return [sys.executable, '-c', f"from oligo_finder.cli import build_parser; build_parser({command!r})"]
+
+def time_command(cmd, repeats):
+    """Returns the median wall-clock time in milliseconds of running a command, or None if it fails."""
+    if cmd is None:
+        return None
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=REPO_DIR)
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            return None
+        timings.append(elapsed * 1000)
+    return statistics.median(timings)
+
+def format_ms(value):
+    return f"{value:.1f}" if value is not None else "-"
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the per-task time of the oligo-finder commands.")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of runs per measurement.")
+    parser.add_argument("--length", type=int, default=1000, help="Length of the fixture transcript.")
+    parser.add_argument("--baseline_ref", default=default_baseline_ref(), help="Git commit of the standalone bin/ scripts.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        write_fixture(work, args.length)
+        bin_dir = work / 'bin'
+        if not (args.baseline_ref and extract_baseline_scripts(args.baseline_ref, bin_dir)):
+            print("Warning: bin/ scripts not found in git history, only timing oligo-finder.", file=sys.stderr)
+            bin_dir = None
+
+        empty = time_command([sys.executable, "-c", "pass"], args.repeats)
+        rows = [("python (empty interpreter)", empty, empty, None, None)]
+        # Steps run in pipeline order, each on the outputs of the previous ones
+        for step, baseline, current in build_steps(work, bin_dir):
+            # The commands are [python, script, ...] and [python, -m, oligo_finder, command, ...]
+            rows.append((
+                step,
+                time_command(baseline_import_command(baseline[1]) if baseline else None, args.repeats),
+                time_command(import_command(current[3]), args.repeats),
+                time_command(baseline, args.repeats),
+                time_command(current, args.repeats),
+            ))
+
+    width = max(len(row[0]) for row in rows)
+    headers = ['bin/ import', 'oligo-finder import', 'bin/ run', 'oligo-finder run']
+    print(f"Fixture: one {args.length} nt transcript; times in ms; '-' means the step does not exist or failed on that side.")
+    print(f"{'Step':<{width}}  " + '  '.join(f"{header:>{len(header)}}" for header in headers))
+    for label, *timings in rows:
+        print(f"{label:<{width}}  " + '  '.join(f"{format_ms(value):>{len(header)}}" for value, header in zip(timings, headers)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Throughput benchmark for the oligo structure scoring.
+
+Scores every candidate window of a random transcript (or of a gene of a
+FASTA file) with `oligo-finder structure`'s scoring function for increasing
+numbers of worker processes, and reports the candidates scored per second.
+The scoring is dominated by one ViennaRNA fold per unique antisense strand,
+so the throughput should scale with the workers up to the CPUs available.
+
+Usage:
+    python benchmarks/structure.py [--length N] [--threads 1,2,4] [--repeats N]
+    python benchmarks/structure.py --input_fasta genes.fa --gene_id gene_A
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from oligo_finder.fasta import load_record  # noqa: E402
+from oligo_finder.structure import score_oligos  # noqa: E402
+
+def candidate_oligos(sequence, surrounding_region_length, offset_5_prime, oligo_length):
+    """Returns the oligo of every surrounding region window, as GENERATE_SEQS does."""
+    return [
+        sequence[i + offset_5_prime:i + offset_5_prime + oligo_length].upper()
+        for i in range(len(sequence) - surrounding_region_length + 1)
+    ]
+
+def time_scoring(oligos, sense_length, antisense_length, threads, repeats):
+    """Returns the median wall-clock time in seconds of scoring the oligos."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        score_oligos(set(oligos), sense_length, antisense_length, threads)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the throughput of the oligo structure scoring.")
+    parser.add_argument("--length", type=int, default=20000, help="Length of the random transcript.")
+    parser.add_argument("--input_fasta", help="FASTA file to take the transcript from instead of a random one.")
+    parser.add_argument("--gene_id", help="Gene ID of the transcript in --input_fasta (default: first record).")
+    parser.add_argument("--threads", default=f"1,{os.cpu_count() or 1}", help="Comma-separated numbers of worker processes.")
+    parser.add_argument("--repeats", type=int, default=3, help="Number of runs per measurement.")
+    parser.add_argument("--surrounding_region_length", type=int, default=45, help="Length of surrounding region.")
+    parser.add_argument("--offset_5_prime", type=int, default=16, help="5' offset.")
+    parser.add_argument("--oligo_length", type=int, default=20, help="Oligo length.")
+    parser.add_argument("--sense_length", type=int, default=14, help="Length of the sense strand.")
+    parser.add_argument("--antisense_length", type=int, default=19, help="Length of the antisense strand.")
+    args = parser.parse_args()
+
+    try:
+        import RNA  # noqa: F401
+    except ImportError:
+        print("Error: ViennaRNA (the RNA Python module) is required for this benchmark.", file=sys.stderr)
+        sys.exit(1)
+
+    if args.input_fasta:
+        index_path = f"{args.input_fasta}.fai" if args.gene_id else None
+        _, sequence = load_record(args.input_fasta, args.gene_id, index_path)
+    else:
+        random.seed(0)
+        sequence = ''.join(random.choice('ACGT') for _ in range(args.length))
+
+    oligos = candidate_oligos(sequence, args.surrounding_region_length, args.offset_5_prime, args.oligo_length)
+    print(f"Transcript length: {len(sequence)} nt, {len(oligos)} candidates, {len(set(oligos))} unique oligos")
+    print(f"{'Workers':>7}  {'Time (s)':>8}  {'Candidates/s':>12}  Speedup")
+    baseline = None
+    for threads in sorted({int(value) for value in args.threads.split(',') if value.strip()}):
+        seconds = time_scoring(oligos, args.sense_length, args.antisense_length, threads, args.repeats)
+        baseline = baseline or seconds
+        print(f"{threads:>7}  {seconds:>8.2f}  {len(oligos) / seconds:>12.0f}  {baseline / seconds:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+/*
+ * Compression of the per-gene intermediates, selected by --intermediate_compression.
+ * Loaded automatically by Nextflow from lib/.
+ */
+class Compression {
+
+    // Method -> [file suffix, compression command of a stream, decompression command of a file]
+    static final Map METHODS = [
+        none: ['', 'cat', 'cat'],
+        gzip: ['.gz', 'gzip -c', 'gzip -dc'],
+        zstd: ['.zst', 'zstd -q -c', 'zstd -q -dc'],
+    ]
+
+    // File suffix of the intermediates, e.g. '.gz'.
+    static String suffix(method) {
+        return METHODS[method.toString()][0]
+    }
+
+    // Command compressing standard input to standard output.
+    static String command(method) {
+        return METHODS[method.toString()][1]
+    }
+
+    // Command decompressing a file to standard output.
+    static String decompressCommand(method) {
+        return METHODS[method.toString()][2]
+    }
+}
@@ -0,0 +1,114 @@
+import java.nio.file.Files
+import java.nio.file.Path
+
+/*
+ * Streaming offset index of a multi-FASTA file: the records of
+ * `oligo-finder index-fasta`, read lazily so that each gene can be emitted
+ * to the per-gene tasks as soon as its sequence has been scanned.
+ * Loaded automatically by Nextflow from lib/.
+ */
+class FastaIndex {
+
+    // Gene ID of a FASTA header, as sanitize_header in oligo_finder/fasta.py.
+    static String geneId(String header) {
+        return header.replaceAll(/[^a-zA-Z0-9_.-]/, '_')
+    }
+
+    // Lazy collection of the [gene ID, length, sequence offset, accession] of
+    // every record. Iterating it scans the file; flatMap emits each record as
+    // the iteration reaches it rather than once the whole file is scanned.
+    static Collection records(Path fasta) {
+        return new AbstractCollection<List>() {
+            Iterator<List> iterator() {
+                return new RecordIterator(fasta)
+            }
+
+            int size() {
+                int count = 0
+                for (record in this) {
+                    count++
+                }
+                return count
+            }
+        }
+    }
+
+    private static class RecordIterator implements Iterator<List> {
+        private final Path fasta
+        private final InputStream input
+        private final Set<String> geneIds = new HashSet<>()
+        private long offset = 0
+        private Map current = null
+        private List pending = null
+        private boolean finished = false
+
+        RecordIterator(Path fasta) {
+            this.fasta = fasta
+            this.input = new BufferedInputStream(Files.newInputStream(fasta), 1 << 20)
+        }
+
+        boolean hasNext() {
+            while (pending == null && !finished) {
+                readLine()
+            }
+            return pending != null
+        }
+
+        List next() {
+            if (!hasNext()) {
+                throw new NoSuchElementException()
+            }
+            def record = pending
+            pending = null
+            return record
+        }
+
+        // Reads one line, completing the current record at the next header and at the end of the file.
+        // As in oligo_finder/fasta.py, offsets count bytes and line ends are not bases.
+        private void readLine() {
+            int b = input.read()
+            if (b == -1) {
+                complete()
+                finished = true
+                input.close()
+                return
+            }
+            boolean header = b == 62  // '>'
+            def text = header ? new ByteArrayOutputStream() : null
+            long lineBytes = 0
+            long lineEnd = 0
+            while (b != -1) {
+                lineBytes++
+                lineEnd = (b == 10 || b == 13) ? lineEnd + 1 : 0
+                if (header) {
+                    text.write(b)
+                }
+                if (b == 10) {
+                    break
+                }
+                b = input.read()
+            }
+
+            if (header) {
+                complete()
+                def name = new String(text.toByteArray(), 'UTF-8').substring(1).replaceAll(/[\r\n]+$/, '')
+                def words = name.tokenize()
+                current = [gene_id: geneId(name), length: 0L, offset: offset + lineBytes, accession: words ? words[0] : '']
+            } else if (current != null) {
+                current.length += lineBytes - lineEnd
+            }
+            offset += lineBytes
+        }
+
+        private void complete() {
+            if (current == null) {
+                return
+            }
+            if (!geneIds.add(current.gene_id)) {
+                throw new IllegalStateException("Duplicate FASTA header for gene ${current.gene_id} in ${fasta}")
+            }
+            pending = [current.gene_id, current.length, current.offset, current.accession]
+            current = null
+        }
+    }
+}
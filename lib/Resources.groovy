@@ -0,0 +1,19 @@
+import nextflow.util.MemoryUnit
+
+/*
+ * Resource models of the pipeline processes, driven by the transcript length
+ * carried in the channel tuples. Loaded automatically by Nextflow from lib/.
+ */
+class Resources {
+
+    // Number of candidate oligos (surrounding region windows) of a transcript.
+    static long candidates(seq_length, surrounding_region_length) {
+        return Math.max(0L, (seq_length as long) - (surrounding_region_length as long) + 1)
+    }
+
+    // Base memory plus a per-unit cost, doubled on every retry and capped at max_memory.
+    static MemoryUnit memory(base, long bytes_per_unit, long units, int attempt, max_memory) {
+        def bytes = (new MemoryUnit(base.toString()).toBytes() + bytes_per_unit * units) * (1L << (attempt - 1))
+        return new MemoryUnit(Math.min(bytes, new MemoryUnit(max_memory.toString()).toBytes()))
+    }
+}
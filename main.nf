@@ -18,57 +18,178 @@ def validate_params() {
     if (!params.target_gene) {
         error "ERROR: A target gene FASTA must be provided using --target_gene <path/to/file.fa>"
     }
-    if (!params.bowtie_index_dir) {
+    if (!params.bowtie_indexes && !params.bowtie_index_dir) {
         error "ERROR: A Bowtie index directory must be provided using --bowtie_index_dir <path/to/dir>"
     }
-    if (!params.bowtie_index_prefix) {
+    if (!params.bowtie_indexes && !params.bowtie_index_prefix) {
         error "ERROR: A Bowtie index prefix must be provided using --bowtie_index_prefix <prefix>"
     }
     if (!params.oligo_length) {
         error "ERROR: An oligo length must be provided using --oligo_length <int>"
     }
+    validate_compression()
 
 }
 
-// --- MODULES ---
-include { SPLIT_FASTA } from './modules/split_fasta'
-include { GENERATE_SEQS } from './modules/generate_seqs'
-include { BOWTIE_ALIGN } from './modules/bowtie_align'
-include { PARSE_SAM } from './modules/parse_sam'
-include { GENERATE_CROSSREACTIVITY_REPORT } from './modules/generate_crossreactivity_report'
-include { MERGE_RESULTS } from './modules/merge_results'
-include { FILTER_MERGED_SEQS } from './modules/filter_merged_seqs'
-include { GENERATE_FINAL_REPORT as GENERATE_COMPLETE_REPORT } from './modules/generate_final_report'
-include { GENERATE_FINAL_REPORT as GENERATE_FILTERED_REPORT } from './modules/generate_final_report'
-include { CALCULATE_TARGET_ACCESSIBILITY } from './modules/calculate_target_accessibility'
+// Function to validate the parameters of the REFILTER entry point.
+def validate_refilter_params() {
+    if (!params.run_id) {
+        error "ERROR: A run ID must be provided using --run_id <ID>"
+    }
+    if (!params.previous_run) {
+        error "ERROR: A previous run directory must be provided using --previous_run <path/to/outdir/run_id>"
+    }
+    if (file(params.previous_run).toAbsolutePath() == file("${params.outdir}/${params.run_id}").toAbsolutePath()) {
+        error "ERROR: --run_id/--outdir must point to a new directory, not to the previous run '${params.previous_run}'"
+    }
+    validate_compression()
+}
 
+// Function to validate the compression of the intermediates.
+def validate_compression() {
+    if (!Compression.METHODS.containsKey(params.intermediate_compression.toString())) {
+        error "ERROR: Unknown --intermediate_compression '${params.intermediate_compression}', " +
+              "expected one of ${Compression.METHODS.keySet().join(', ')}"
+    }
+}
 
+// Function to load the references to screen the oligos against, as
+// [name, bowtie index path, gene ID to accession file, column suffix] lists.
+// Without a --bowtie_indexes sheet the single reference of --bowtie_index_dir,
+// --bowtie_index_prefix and --geneid_accession keeps the unsuffixed columns.
+def load_references() {
+    if (!params.bowtie_indexes) {
+        return [[
+            params.species,
+            "${params.bowtie_index_dir}/${params.bowtie_index_prefix}",
+            params.geneid_accession,
+            ""
+        ]]
+    }
+    def rows = file(params.bowtie_indexes, checkIfExists: true).splitCsv(header: true)
+    if (!rows) {
+        error "ERROR: No references found in '${params.bowtie_indexes}'"
+    }
+    def columns = ['name', 'index_dir', 'index_prefix', 'geneid_accession']
+    def references = rows.collect { row ->
+        def missing = columns.findAll { column -> !row[column] }
+        if (missing) {
+            error "ERROR: Missing ${missing.join(', ')} for a reference in '${params.bowtie_indexes}'"
+        }
+        if (!(row.name ==~ /[A-Za-z0-9_]+/)) {
+            error "ERROR: Reference name '${row.name}' in '${params.bowtie_indexes}' may only contain letters, digits and underscores"
+        }
+        [row.name, "${row.index_dir}/${row.index_prefix}", row.geneid_accession, "_${row.name}"]
+    }
+    def duplicates = references*.getAt(0).countBy { it }.findAll { name, count -> count > 1 }.keySet()
+    if (duplicates) {
+        error "ERROR: Duplicate reference names in '${params.bowtie_indexes}': ${duplicates.join(', ')}"
+    }
+    return references
+}
 
-// --- WORKFLOW ---
-workflow {
+// Parameters that affect the merged tables. The REFILTER entry point takes them
+// from the previous run and refuses to change them.
+def upstream_param_names() {
+    return [
+        'bowtie_index_dir', 'bowtie_index_prefix', 'bowtie_indexes',
+        'target_gene', 'weight_matrix', 'microrna_seeds', 'geneid_accession', 'cds_region',
+        'surrounding_region_length', 'oligo_length', 'offset_5_prime',
+        'offset_refseq_seed', 'refseq_seed_length', 'offset_microrna', 'microrna_seed_length',
+        'max_mismatch',
+        'plfold_winsize', 'plfold_span', 'plfold_ulength'
+    ]
+}
 
-    // Validate parameters at the start of the workflow.
-    validate_params()
+// Defaults of the upstream parameters added after runs started recording their
+// metadata. Older runs were run with these values, which they did not record.
+def upstream_param_defaults() {
+    return [
+        bowtie_indexes: ''
+    ]
+}
 
-    // ===== RECORD METADATA =====
-    def metadata = [
+// Function to load the metadata JSON published by a previous run.
+def load_previous_metadata(previous_run) {
+    def metadata_files = file("${previous_run}/*_run_metadata.json")
+    if (metadata_files.size() != 1) {
+        error "ERROR: Expected exactly one *_run_metadata.json in '${previous_run}', found ${metadata_files.size()}"
+    }
+    return new groovy.json.JsonSlurper().parse(metadata_files[0].toFile())
+}
+
+// Function to load the pipeline defaults of the parameters: the params block of the
+// pipeline's nextflow.config, evaluated without the -c, -params-file and command line overrides.
+def default_params() {
+    def text = file("${projectDir}/nextflow.config").text
+    def start = text.indexOf('{', text.indexOf('params {'))
+    def depth = 0
+    def end = start
+    for (; end < text.length(); end++) {
+        depth += text[end] == '{' ? 1 : text[end] == '}' ? -1 : 0
+        if (depth == 0) {
+            break
+        }
+    }
+    def slurper = new ConfigSlurper()
+    slurper.setBinding([baseDir: projectDir, projectDir: projectDir])
+    return slurper.parse("params ${text.substring(start, end + 1)}").params
+}
+
+// Function to list the parameters given on the command line as --name or --name=value.
+def command_line_param_names() {
+    return workflow.commandLine.tokenize(' ')
+        .findAll { token -> token.startsWith('--') }
+        .collect { token -> token.substring(2).tokenize('=')[0] }
+}
+
+// Function to take the upstream parameters from the previous run. Upstream
+// parameters set to another value than the previous run's must not be set at
+// all: given on the command line, or differing from the pipeline default when
+// set through -params-file or a -c config.
+def resolve_upstream_params(previous_metadata) {
+    def defaults = upstream_param_defaults()
+    def upstream = upstream_param_names().collectEntries { name ->
+        [(name): previous_metadata.containsKey(name) ? previous_metadata[name] : defaults[name]]
+    }
+    def pipeline_defaults = default_params()
+    def given = command_line_param_names()
+    def changed = upstream_param_names().findAll { name ->
+        def current = params[name]?.toString()
+        current != upstream[name]?.toString() && (name in given || current != pipeline_defaults[name]?.toString())
+    }
+    if (changed) {
+        def details = changed.collect { name ->
+            "    --${name}: previous run '${upstream[name]}', current '${params[name]}'"
+        }.join('\n')
+        error "ERROR: The following parameters differ from the previous run '${previous_metadata.run_id}' " +
+              "and require a full rerun:\n${details}"
+    }
+    return upstream
+}
+
+// Function to collect the run metadata recorded next to the results.
+def build_metadata() {
+    return [
         run_id: params.run_id,
         timestamp: new Date().format('yyyy-MM-dd HH:mm:ss'),
         nextflow_version: nextflow.version.toString(),
         workflow_session: workflow.sessionId,
         profile: workflow.profile,
-    
+
         // Reference genome parameters
         bowtie_index_dir: params.bowtie_index_dir,
         bowtie_index_prefix: params.bowtie_index_prefix,
-    
+        bowtie_indexes: params.bowtie_indexes,
+        references: load_references().collect { reference -> reference[0] },
+
         // Input files
         target_gene: params.target_gene,
         weight_matrix: params.weight_matrix,
         microrna_seeds: params.microrna_seeds,
         geneid_accession: params.geneid_accession,
         cds_region: params.cds_region,
-    
+
         // Design parameters
         surrounding_region_length: params.surrounding_region_length,
         oligo_length: params.oligo_length,
@@ -77,16 +198,16 @@ workflow {
         refseq_seed_length: params.refseq_seed_length,
         offset_microrna: params.offset_microrna,
         microrna_seed_length: params.microrna_seed_length,
-    
+
         // Filtering parameters
         min_gc: params.min_gc,
         max_gc: params.max_gc,
         microrna_hits_threshold: params.microrna_hits_threshold,
         forbidden_motifs: params.forbidden_motifs,
-    
+
         // Alignment parameters
         max_mismatch: params.max_mismatch,
-    
+
         // Synthesis parameters
         sense_length: params.sense_length,
         antisense_length: params.antisense_length,
@@ -95,47 +216,116 @@ workflow {
         plfold_winsize: params.plfold_winsize,
         plfold_span: params.plfold_span,
         plfold_ulength: params.plfold_ulength,
-    
+
+        // Intermediate file compression
+        intermediate_compression: params.intermediate_compression,
+
+        // Per-gene reports
+        per_gene_reports: params.per_gene_reports,
+
         // Output directory
         outdir: params.outdir
     ]
+}
 
-    // Create output directory if it doesn't exist
-    // new File("${params.outdir}/${params.run_id}").mkdirs()
-
-    // Write metadata to JSON file
+// Function to write the run metadata to JSON file.
+def write_metadata(metadata) {
     def metadata_json = file("${params.outdir}/${params.run_id}/${params.run_id}_run_metadata.json")
     metadata_json.text = groovy.json.JsonOutput.prettyPrint(groovy.json.JsonOutput.toJson(metadata))
+    return metadata_json
+}
 
-    // ===== END: RECORD METADATA =====
+// --- MODULES ---
+include { GENERATE_SEQS } from './modules/generate_seqs'
+include { BOWTIE_ALIGN } from './modules/bowtie_align'
+include { PARSE_SAM } from './modules/parse_sam'
+include { GENERATE_CROSSREACTIVITY_REPORT } from './modules/generate_crossreactivity_report'
+include { MERGE_RESULTS } from './modules/merge_results'
+include { FILTER_MERGED_SEQS } from './modules/filter_merged_seqs'
+include { GENERATE_FINAL_REPORT as GENERATE_COMPLETE_REPORT } from './modules/generate_final_report'
+include { GENERATE_FINAL_REPORT as GENERATE_FILTERED_REPORT } from './modules/generate_final_report'
+include { CALCULATE_TARGET_ACCESSIBILITY } from './modules/calculate_target_accessibility'
+include { OLIGO_STRUCTURE } from './modules/oligo_structure'
+include { AGGREGATE_RESULTS } from './modules/aggregate_results'
+include { UPDATE_MERGED_RESULTS } from './modules/update_merged_results'
+
+
+// --- SUBWORKFLOWS ---
+// Score the self-structure and duplex end stability of the unique oligos of the
+// given (gene ID, length, table) tuples, generated or merged. The genes are
+// grouped by structure_group_size as they arrive, so that the windows shared
+// by isoforms adjacent in the FASTA are scored once without waiting for the
+// whole run. Emits the scores of its group for each gene.
+workflow SCORE_OLIGO_STRUCTURE {
+    take:
+    tables
+
+    main:
+    OLIGO_STRUCTURE (
+        tables
+            .collate(params.structure_group_size as int)
+            .map { group ->
+                tuple(
+                    "${group[0][0]}.group",
+                    group.collect { gene_id, seq_length, table -> gene_id },
+                    group.sum { gene_id, seq_length, table -> Resources.candidates(seq_length, params.surrounding_region_length) },
+                    group.collect { gene_id, seq_length, table -> table }
+                )
+            }
+    )
+
+    emit:
+    oligo_structure = OLIGO_STRUCTURE.out.oligo_structure
+        .flatMap { gene_ids, scores -> gene_ids.collect { gene_id -> tuple(gene_id, scores) } }
+}
+
+// --- WORKFLOW ---
+workflow {
+
+    // Validate parameters at the start of the workflow.
+    validate_params()
 
-    // 0. Split the multi-fasta file into a channel of single-gene fasta files
-    split_script_ch = channel.value(file("${baseDir}/bin/split_fasta.awk"))
-    target_gene_ch  = channel.value(file(params.target_gene, checkIfExists: true))
+    // ===== RECORD METADATA =====
+    def metadata_json = write_metadata(build_metadata())
+    // ===== END: RECORD METADATA =====
 
-    SPLIT_FASTA(split_script_ch, target_gene_ch)
+    // 0. Scan the offsets of the genes of the multi-fasta file instead of splitting it into one
+    // file per gene. Each gene is emitted as soon as the scan has read it, with its transcript
+    // length, sequence offset and accession; every task reads its gene by offset from the shared
+    // file. The length drives the resources of every downstream process.
+    target_gene_ch = channel.value(file(params.target_gene, checkIfExists: true))
 
-    // Take the channel of files from SPLIT_FASTA and transform it into the tuple format.
-    SPLIT_FASTA.out.fasta_files
-        .flatten()
-        .map { file -> tuple(file.baseName, file) }
+    channel
+        .fromPath(params.target_gene, checkIfExists: true)
+        .flatMap { fasta -> FastaIndex.records(fasta) }
         .set { ch_genes }
 
     // 1. Generate metadata and oligo candidates from each target gene in parallel
     GENERATE_SEQS (
-        ch_genes
+        ch_genes,
+        target_gene_ch
     )
 
     // Add target accessibility calculation step
     CALCULATE_TARGET_ACCESSIBILITY (
-        ch_genes
+        ch_genes,
+        target_gene_ch
     )
 
-    // 2. Align the oligo sequences for each gene.
-    BOWTIE_ALIGN (
+    // Score the self-structure and duplex end stability of the oligos once per group of genes:
+    // overlapping isoforms share most of their windows.
+    SCORE_OLIGO_STRUCTURE (
         GENERATE_SEQS.out.seqs
     )
 
+    // 2. Align the seeds of each gene against every reference concurrently,
+    // all references reading the seeds from the seqs table written by GENERATE_SEQS.
+    def references = load_references()
+
+    BOWTIE_ALIGN (
+        GENERATE_SEQS.out.seqs.combine(channel.fromList(references))
+    )
+
     // 3. Parse the SAM file for each gene into a structured JSON format
     PARSE_SAM (
         BOWTIE_ALIGN.out.sam
@@ -146,29 +336,140 @@ workflow {
         PARSE_SAM.out.json
     )
 
-    // 5. Merge the filtered sequences and cross-reactivity reports for each gene
+    // 5. Merge the filtered sequences and the cross-reactivity reports of all references for each gene.
+    // The reports arrive in completion order, they are sorted into the order of the references so that
+    // the column groups are the same for every gene and the merge inputs are stable for -resume.
+    def reference_names = references.collect { reference -> reference[0] }
+
+    GENERATE_CROSSREACTIVITY_REPORT.out.crossreactivity_report
+        .groupTuple(size: references.size())
+        .map { gene_id, names, reports ->
+            tuple(gene_id, [names, reports].transpose().sort { pair -> reference_names.indexOf(pair[0]) }.collect { pair -> pair[1] })
+        }
+        .set { ch_crossreactivity_reports }
+
     MERGE_RESULTS (
-        GENERATE_SEQS.out.seqs,
-        CALCULATE_TARGET_ACCESSIBILITY.out.target_accessibility,
-        GENERATE_CROSSREACTIVITY_REPORT.out.crossreactivity_report
+        GENERATE_SEQS.out.seqs
+            .join(CALCULATE_TARGET_ACCESSIBILITY.out.target_accessibility)
+            .join(SCORE_OLIGO_STRUCTURE.out.oligo_structure)
+            .join(ch_crossreactivity_reports)
     )
 
-    // 6. Generate the final COMPLETE report with chemically-modified format
-    GENERATE_COMPLETE_REPORT (
-        MERGE_RESULTS.out.merged_result,
-        "complete"
+    // 6. Aggregate the merged results of all genes into one indexed run-level database
+    AGGREGATE_RESULTS (
+        MERGE_RESULTS.out.merged_result.map { gene_id, seq_length, merged -> merged }.collect(),
+        channel.value(metadata_json),
+        params.species
     )
 
-    // 7. Filter the merged sequences based on GC content, microRNA hits, and forbidden motifs
-    FILTER_MERGED_SEQS (
-        MERGE_RESULTS.out.merged_result
+    // Per-gene reports are optional, they can be exported on demand from the results database
+    if (params.per_gene_reports) {
+
+        // 7. Generate the final COMPLETE report with chemically-modified format
+        GENERATE_COMPLETE_REPORT (
+            MERGE_RESULTS.out.merged_result,
+            "complete"
+        )
+
+        // 8. Filter the merged sequences based on GC content, microRNA hits, and forbidden motifs
+        FILTER_MERGED_SEQS (
+            MERGE_RESULTS.out.merged_result
+        )
+
+        // 9. Generate the final FILTERED report with chemically-modified format
+        GENERATE_FILTERED_REPORT (
+            FILTER_MERGED_SEQS.out.filtered_seqs,
+            "filtered"
+        )
+    }
+
+}
+
+// --- REFILTER WORKFLOW ---
+// Re-filter and re-report the merged tables published by a previous run.
+// Only the filtering and synthesis parameters may change; run with `-entry REFILTER`.
+// New synthesis lengths rescore the structure of the reused merged tables.
+workflow REFILTER {
+
+    // Validate parameters and check that the previous run is reusable.
+    validate_refilter_params()
+    def previous_metadata = load_previous_metadata(params.previous_run)
+    def upstream = resolve_upstream_params(previous_metadata)
+
+    // ===== RECORD METADATA =====
+    def metadata = build_metadata()
+    metadata.putAll(upstream)
+    metadata.references = previous_metadata.references ?: [params.species]
+    metadata.previous_run = params.previous_run
+    metadata.previous_run_id = previous_metadata.run_id
+    def metadata_json = write_metadata(metadata)
+    // ===== END: RECORD METADATA =====
+
+    // 0. Collect the merged tables of the previous run, with the transcript lengths
+    // from the (unchanged) target gene FASTA for the resource models.
+    channel
+        .fromPath(upstream.target_gene, checkIfExists: true)
+        .flatMap { fasta -> FastaIndex.records(fasta) }
+        .map { gene_id, seq_length, offset, accession -> tuple(gene_id, seq_length) }
+        .set { ch_lengths }
+
+    channel
+        .fromPath("${params.previous_run}/*.compete.tsv*", checkIfExists: true)
+        .map { file -> tuple(file.name.replaceFirst(/\.compete\.tsv(\.gz|\.zst)?$/, ''), file) }
+        .join(ch_lengths)
+        .map { gene_id, merged, seq_length -> tuple(gene_id, seq_length, merged) }
+        .set { ch_previous_merged }
+
+    // 1. Rescore the oligo structure if the synthesis lengths changed (or were not recorded)
+    def rescore = ['sense_length', 'antisense_length'].any { name ->
+        previous_metadata[name]?.toString() != params[name]?.toString()
+    }
+    if (rescore) {
+        SCORE_OLIGO_STRUCTURE (
+            ch_previous_merged
+        )
+        ch_previous_merged
+            .join(SCORE_OLIGO_STRUCTURE.out.oligo_structure)
+            .set { ch_update }
+    } else {
+        ch_previous_merged
+            .map { gene_id, seq_length, merged -> tuple(gene_id, seq_length, merged, []) }
+            .set { ch_update }
+    }
+
+    // 2. Publish the merged tables into the new run directory, with the new structure
+    // scores, so that this run can be refiltered in turn
+    UPDATE_MERGED_RESULTS (
+        ch_update
     )
 
-    // 8. Generate the final FILTERED report with chemically-modified format
-    GENERATE_FILTERED_REPORT (
-        FILTER_MERGED_SEQS.out.filtered_seqs,
-        "filtered"
+    // 3. Aggregate the merged tables into the results database of the new run, recording its
+    // filtering and synthesis parameters as the defaults of query and export
+    AGGREGATE_RESULTS (
+        UPDATE_MERGED_RESULTS.out.merged_result.map { gene_id, seq_length, merged -> merged }.collect(),
+        channel.value(metadata_json),
+        metadata.references[0]
     )
 
-}
+    // Per-gene reports are optional, as in the main workflow
+    if (params.per_gene_reports) {
+
+        // 4. Generate the final COMPLETE report with chemically-modified format
+        GENERATE_COMPLETE_REPORT (
+            UPDATE_MERGED_RESULTS.out.merged_result,
+            "complete"
+        )
+
+        // 5. Filter the merged sequences based on GC content, microRNA hits, and forbidden motifs
+        FILTER_MERGED_SEQS (
+            UPDATE_MERGED_RESULTS.out.merged_result
+        )
 
+        // 6. Generate the final FILTERED report with chemically-modified format
+        GENERATE_FILTERED_REPORT (
+            FILTER_MERGED_SEQS.out.filtered_seqs,
+            "filtered"
+        )
+    }
+
+}
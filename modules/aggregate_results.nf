@@ -0,0 +1,27 @@
+process AGGREGATE_RESULTS {
+    tag "${params.run_id} - Aggregate Results"
+    label 'process_single'
+    publishDir "${params.outdir}/${params.run_id}", mode: 'copy'
+
+    input:
+    path merged_results
+    path run_metadata
+    val default_reference
+
+    output:
+    path "${params.run_id}.results.sqlite", emit: results_db
+
+    script:
+    def output_db = "${params.run_id}.results.sqlite"
+    // The file list is written with the printf builtin, a single command line
+    // would exceed the argument length limit for genome-wide runs.
+    """
+    printf '%s\\n' ${merged_results} > merged_results.txt
+
+    oligo-finder aggregate \\
+        --merged_list merged_results.txt \\
+        --run_metadata ${run_metadata} \\
+        --default_reference ${default_reference} \\
+        --output ${output_db}
+    """
+}
@@ -1,29 +1,34 @@
 process BOWTIE_ALIGN {
-    tag "${params.run_id} - $gene_id - Bowtie Alignment"
+    tag "${params.run_id} - $gene_id - $reference - Bowtie Alignment"
+    label 'process_multi'
+    // Dominated by the Bowtie index, plus the alignment buffers
+    memory { Resources.memory(params.bowtie_memory, 1000, Resources.candidates(seq_length, params.surrounding_region_length), task.attempt, params.max_memory) }
 
     input:
-    tuple val(gene_id), path(metadata_seq)
+    tuple val(gene_id), val(seq_length), path(metadata_seq), val(reference), val(bowtie_index_path), val(geneid_accession), val(column_suffix)
 
     output:
-    tuple val(gene_id), path("${gene_id}.sam"), emit: sam
+    tuple val(gene_id), val(seq_length), val(reference), val(geneid_accession), val(column_suffix), path("${gene_id}.${reference}.sam${Compression.suffix(params.intermediate_compression)}"), emit: sam
 
     script:
     def threads = task.cpus
-    def refseq_seed_fasta = "${gene_id}_refseq_seed.fasta"
-    def output_sam = "${gene_id}.sam"
-    def bowtie_index_path = "${params.bowtie_index_dir}/${params.bowtie_index_prefix}"
+    def output_sam = "${gene_id}.${reference}.sam${Compression.suffix(params.intermediate_compression)}"
+    def compress = Compression.command(params.intermediate_compression)
+    def decompress = Compression.decompressCommand(params.intermediate_compression)
 
     // Bowtie command to perform the alignment.
     // Allowing up to 'max_mismatch' mismatches.
     // The --norc option is used to prevent alignment to the reverse complement strand.
+    // The refseq seeds are streamed to Bowtie from the seqs table rather than stored again,
+    // and the SAM output is streamed through the configured intermediate compression.
     """
-    # Extract oligo sequences from metadata file
-    awk 'NR>1 {print ">"\$1"\\n"\$6}' ${metadata_seq} > ${refseq_seed_fasta}
-    
-    bowtie --threads ${threads} --quiet -a --norc \\
-        ${bowtie_index_path} \\
-        -f ${refseq_seed_fasta} \\
-        -S ${output_sam} \\
-        -v ${params.max_mismatch}
+    ${decompress} ${metadata_seq} \\
+        | awk -F '\\t' 'NR == 1 { for (i = 1; i <= NF; i++) column[\$i] = i; next } { print ">" \$1 "\\n" \$column["Refseq_Seed"] }' \\
+        | bowtie --threads ${threads} --quiet -a --norc \\
+            ${bowtie_index_path} \\
+            -f - \\
+            -S \\
+            -v ${params.max_mismatch} \\
+        | ${compress} > ${output_sam}
     """
 }
\ No newline at end of file
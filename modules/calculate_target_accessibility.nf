@@ -1,18 +1,24 @@
 process CALCULATE_TARGET_ACCESSIBILITY {
     tag "${params.run_id} - $gene_id - Calculate Target Accessibility"
+    label 'process_single'
+    // RNAplfold keeps ulength + 1 unpaired probabilities per nucleotide
+    memory { Resources.memory('1.GB', 2000, seq_length as long, task.attempt, params.max_memory) }
 
     input:
-    tuple val(gene_id), path(target_gene)
+    tuple val(gene_id), val(seq_length), val(offset), val(accession)
+    path target_gene
 
     output:
-    path("${gene_id}.target_accessibility.tsv"), emit: target_accessibility
+    tuple val(gene_id), path("${gene_id}.target_accessibility.tsv${Compression.suffix(params.intermediate_compression)}"), emit: target_accessibility
 
     script:
-    def output_accessibility = "${gene_id}.target_accessibility.tsv"
+    def output_accessibility = "${gene_id}.target_accessibility.tsv${Compression.suffix(params.intermediate_compression)}"
 
     """
-    calculate_target_accessibility.py \
+    oligo-finder accessibility \
         --input_fasta ${target_gene} \
+        --offset ${offset} \
+        --length ${seq_length} \
         --output ${output_accessibility} \
         --winsize ${params.plfold_winsize} \
         --span ${params.plfold_span} \
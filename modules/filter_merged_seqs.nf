@@ -1,17 +1,20 @@
 process FILTER_MERGED_SEQS {
     tag "${params.run_id} - $gene_id - Filter Merged Sequences"
+    label 'process_single'
+    // One pandas table with one row per candidate and mismatch level
+    memory { Resources.memory('1.GB', 4000, Resources.candidates(seq_length, params.surrounding_region_length), task.attempt, params.max_memory) }
 
     input:
-    tuple val(gene_id), path(merged_seq)
+    tuple val(gene_id), val(seq_length), path(merged_seq)
 
     output:
-    tuple val(gene_id), path("${gene_id}.filtered.tsv"), emit: filtered_seqs
+    tuple val(gene_id), val(seq_length), path("${gene_id}.filtered.tsv${Compression.suffix(params.intermediate_compression)}"), emit: filtered_seqs
 
     script:
-    def output_seqs = "${gene_id}.filtered.tsv"
+    def output_seqs = "${gene_id}.filtered.tsv${Compression.suffix(params.intermediate_compression)}"
 
     """
-    filter_sequences.py \
+    oligo-finder filter \
         --seq_file ${merged_seq} \
         --min_gc ${params.min_gc} \
         --max_gc ${params.max_gc} \
@@ -1,18 +1,21 @@
 process GENERATE_CROSSREACTIVITY_REPORT {
-    tag "${params.run_id} - $gene_id - Generate Cross-Reactivity Report"
+    tag "${params.run_id} - $gene_id - $reference - Generate Cross-Reactivity Report"
+    label 'process_single'
+    // The parsed JSON is loaded as a whole
+    memory { Resources.memory('1.GB', 2000, Resources.candidates(seq_length, params.surrounding_region_length), task.attempt, params.max_memory) }
 
     input:
-    tuple val(gene_id), path(json_file)
+    tuple val(gene_id), val(seq_length), val(reference), val(column_suffix), path(json_file)
 
     output:
-    path "${gene_id}.crossreactivity.tsv", emit: crossreactivity_report
+    tuple val(gene_id), val(reference), path("${gene_id}.${reference}.crossreactivity.tsv${Compression.suffix(params.intermediate_compression)}"), emit: crossreactivity_report
 
     script:
-    def output_tsv = "${gene_id}.crossreactivity.tsv"
+    def output_tsv = "${gene_id}.${reference}.crossreactivity.tsv${Compression.suffix(params.intermediate_compression)}"
     """
-    generate_crossreactivity_report.py \\
+    oligo-finder crossreactivity \\
         --json ${json_file} \\
         --output ${output_tsv} \\
-        --geneid_accession ${params.geneid_accession}
+        --column_suffix "${column_suffix}"
     """
 }
\ No newline at end of file
@@ -1,9 +1,12 @@
 process GENERATE_FINAL_REPORT {
     tag "${params.run_id} - $gene_id - Generate chemically-modified format ($report_type)"
     publishDir "${params.outdir}/${params.run_id}", mode: 'copy'
+    label 'process_single'
+    // One pandas table per candidate and mismatch level, plus the openpyxl workbook
+    memory { Resources.memory('1.GB', 8000, Resources.candidates(seq_length, params.surrounding_region_length), task.attempt, params.max_memory) }
 
     input:
-    tuple val(gene_id), path(report)
+    tuple val(gene_id), val(seq_length), path(report)
     val report_type
 
     output:
@@ -12,7 +15,7 @@ process GENERATE_FINAL_REPORT {
     script:
     def output_order = "${gene_id}.${report_type}.final.xlsx"
     """
-    generate_final_report.py \\
+    oligo-finder report \\
         --report_tsv ${report} \\
         --output_xlsx ${output_order} \\
         --sense_length ${params.sense_length} \\
@@ -1,18 +1,25 @@
 process GENERATE_SEQS {
     tag "${params.run_id} - $gene_id - Generate Sequences"
+    label 'process_single'
+    // The candidates are streamed to the output, memory does not depend on the length
+    memory { Resources.memory('1.GB', 0, 0, task.attempt, params.max_memory) }
 
     input:
-    tuple val(gene_id), path(target_gene)
+    tuple val(gene_id), val(seq_length), val(offset), val(accession)
+    path target_gene
 
     output:
-    tuple val(gene_id), path("${gene_id}.seqs.tsv"), emit: seqs
+    tuple val(gene_id), val(seq_length), path("${gene_id}.seqs.tsv${Compression.suffix(params.intermediate_compression)}"), emit: seqs
 
     script:
-    def seq = "${gene_id}.seqs.tsv"
+    def seq = "${gene_id}.seqs.tsv${Compression.suffix(params.intermediate_compression)}"
     """
-    generate_sequences.py \\
+    oligo-finder generate \\
         --input_fasta ${target_gene} \\
         --gene_id ${gene_id} \\
+        --offset ${offset} \\
+        --length ${seq_length} \\
+        --accession '${accession}' \\
         --output ${seq} \\
         --surrounding_region_length ${params.surrounding_region_length} \\
         --offset_5_prime ${params.offset_5_prime} \\
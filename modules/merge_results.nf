@@ -1,21 +1,24 @@
 process MERGE_RESULTS {
     tag "${params.run_id} - $gene_id - Merge Results"
+    publishDir "${params.outdir}/${params.run_id}", mode: 'copy'
+    label 'process_single'
+    // Pandas tables with one row per candidate and mismatch level, one per reference
+    memory { Resources.memory('1.GB', 8000, Resources.candidates(seq_length, params.surrounding_region_length), task.attempt, params.max_memory) }
 
     input:
-    tuple val(gene_id), path(metadata)
-    path target_accessibility
-    path crossreactivity_report
+    tuple val(gene_id), val(seq_length), path(metadata), path(target_accessibility), path(oligo_structure), path(crossreactivity_reports)
     
     output:
-    tuple val(gene_id), path("${gene_id}.compete.tsv"), emit: merged_result
+    tuple val(gene_id), val(seq_length), path("${gene_id}.compete.tsv${Compression.suffix(params.intermediate_compression)}"), emit: merged_result
 
     script:
-    def output_tsv = "${gene_id}.compete.tsv"
+    def output_tsv = "${gene_id}.compete.tsv${Compression.suffix(params.intermediate_compression)}"
     """
-    merge_results.py \\
+    oligo-finder merge \\
         --filtered_metadata ${metadata} \\
         --target_accessibility ${target_accessibility} \\
-        --crossreactivity_report ${crossreactivity_report} \\
+        --oligo_structure ${oligo_structure} \\
+        --crossreactivity_report ${crossreactivity_reports} \\
         --output ${output_tsv}
     """
 }
\ No newline at end of file
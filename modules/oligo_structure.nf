@@ -0,0 +1,23 @@
+process OLIGO_STRUCTURE {
+    tag "${params.run_id} - $group_id - Oligo Structure"
+    label 'process_multi'
+    // One score per unique oligo of the group, plus a fold per unique antisense strand in each worker
+    memory { Resources.memory('1.GB', 500, candidates as long, task.attempt, params.max_memory) }
+
+    input:
+    tuple val(group_id), val(gene_ids), val(candidates), path(seqs, stageAs: 'seqs/*')
+
+    output:
+    tuple val(gene_ids), path("${group_id}.oligo_structure.tsv${Compression.suffix(params.intermediate_compression)}"), emit: oligo_structure
+
+    script:
+    def output_structure = "${group_id}.oligo_structure.tsv${Compression.suffix(params.intermediate_compression)}"
+    """
+    oligo-finder structure \\
+        --seqs ${seqs} \\
+        --output ${output_structure} \\
+        --sense_length ${params.sense_length} \\
+        --antisense_length ${params.antisense_length} \\
+        --threads ${task.cpus}
+    """
+}
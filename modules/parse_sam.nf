@@ -1,16 +1,22 @@
 process PARSE_SAM {
-    tag "${params.run_id} - $gene_id - Parse SAM File"
-    publishDir "${params.outdir}/${params.run_id}", mode: 'copy'
+    tag "${params.run_id} - $gene_id - $reference - Parse SAM File"
+    publishDir "${params.outdir}/${params.run_id}", mode: 'copy', enabled: params.per_gene_reports
+    label 'process_single'
+    // Gene ID mapping plus the capped per-oligo summaries
+    memory { Resources.memory('1.GB', 1000, Resources.candidates(seq_length, params.surrounding_region_length), task.attempt, params.max_memory) }
     
     input:
-    tuple val(gene_id), path(sam_file)
+    tuple val(gene_id), val(seq_length), val(reference), val(geneid_accession), val(column_suffix), path(sam_file)
 
     output:
-    tuple val(gene_id), path("${gene_id}.json"), emit: json
+    tuple val(gene_id), val(seq_length), val(reference), val(column_suffix), path("${gene_id}.${reference}.json${Compression.suffix(params.intermediate_compression)}"), emit: json
 
     script:
-    def output_json = "${gene_id}.json"
+    def output_json = "${gene_id}.${reference}.json${Compression.suffix(params.intermediate_compression)}"
     """
-    parse_sam.py --sam ${sam_file} --output ${output_json}
+    oligo-finder parse-sam \\
+        --sam ${sam_file} \\
+        --output ${output_json} \\
+        --geneid_accession ${geneid_accession}
     """
 }
\ No newline at end of file
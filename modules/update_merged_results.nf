@@ -0,0 +1,28 @@
+process UPDATE_MERGED_RESULTS {
+    tag "${params.run_id} - $gene_id - Update Merged Results"
+    publishDir "${params.outdir}/${params.run_id}", mode: 'copy'
+    label 'process_single'
+    // Pandas table with one row per candidate and mismatch level, when the structure scores are replaced
+    memory { Resources.memory('1.GB', oligo_structure ? 4000 : 0, Resources.candidates(seq_length, params.surrounding_region_length), task.attempt, params.max_memory) }
+
+    input:
+    tuple val(gene_id), val(seq_length), path(merged, stageAs: 'previous/*'), path(oligo_structure)
+
+    output:
+    tuple val(gene_id), val(seq_length), path("${merged.name}"), emit: merged_result
+
+    script:
+    // The previous run's table is staged in a subdirectory, the copy takes its name in the new run.
+    // Without structure scores (unchanged synthesis lengths) the table is copied as is.
+    if (oligo_structure)
+        """
+        oligo-finder update-merged \\
+            --merged ${merged} \\
+            --oligo_structure ${oligo_structure} \\
+            --output ${merged.name}
+        """
+    else
+        """
+        cp ${merged} ${merged.name}
+        """
+}
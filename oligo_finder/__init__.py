@@ -0,0 +1,3 @@
+"""OLIGO-FINDER-NF command line tools."""
+
+__version__ = "0.1.0"
@@ -1,26 +1,22 @@
-#!/usr/bin/env python
+"""Calculate the target accessibility of a gene with RNAplfold."""
 
-import RNA
-import argparse
+from .fasta import add_record_arguments, load_record, record_from_args
+from .io_utils import open_text
+from .seq_utils import convert_dna_to_rna
 
-def load_sequence(input_fasta):
+def load_sequence(input_fasta, gene_id=None, fasta_index=None, record=None):
     """Loads a RNA sequence."""
-    with open(input_fasta, "r") as f:
-        lines = f.readlines()
-        seq = "".join(
-            line.strip().replace("T", "U")
-            for line in lines
-            if not line.startswith(">")
-        )
-    return seq.upper()
+    _, seq = load_record(input_fasta, gene_id, fasta_index, record)
+    return convert_dna_to_rna(seq)
 
 
-def calculate_accessibility(gene_id, input_fasta, output, winsize, span, ulength, surrounding_region_length, oligo_length, offset_5_prime):
+def calculate_accessibility(gene_id, input_fasta, output, winsize, span, ulength, surrounding_region_length, oligo_length, offset_5_prime, fasta_index=None, record=None):
     # sourcery skip: avoid-builtin-shadow
     """Calculates the target accessibility of a RNA sequence using RNAplfold."""
-    
+    import RNA
+
     ## Load sequence
-    seq = load_sequence(input_fasta)
+    seq = load_sequence(input_fasta, gene_id, fasta_index, record)
     
     ## Run RNAplfold
     pl_matrix = RNA.pfl_fold_up(seq, ulength, winsize, span)
@@ -34,7 +30,7 @@ def calculate_accessibility(gene_id, input_fasta, output, winsize, span, ulength
             
     results = results[offset_5_prime:-(surrounding_region_length - oligo_length - offset_5_prime)]
     
-    with open(output, "w") as out_f:
+    with open_text(output, "w") as out_f:
         out_f.write("#ID\tTarget_Accessibility\n")
         for i in range(len(results)):
             id = f"{gene_id}_{i+1}"
@@ -43,10 +39,10 @@ def calculate_accessibility(gene_id, input_fasta, output, winsize, span, ulength
     
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Calculate target accessibility of RNA sequences.")
+def add_arguments(parser):
     parser.add_argument("--gene_id", type=str, help="Gene ID/accession.")
     parser.add_argument("--input_fasta", type=str, help="target gene sequence to analyze.")
+    add_record_arguments(parser)
     parser.add_argument("--output", type=str, help="Output file to save accessibility results.")
     parser.add_argument("--winsize", type=int, default=70, help="Window size for RNAplfold.")
     parser.add_argument("--span", type=int, default=50, help="Span for RNAplfold.")
@@ -55,9 +51,5 @@ def main():
     parser.add_argument("--oligo_length", type=int, help="Length of oligo.")
     parser.add_argument("--offset_5_prime", type=int, help="Offset for 5' end of oligo.")
 
-    args = parser.parse_args()
-
-    calculate_accessibility(args.gene_id, args.input_fasta, args.output, args.winsize, args.span, args.ulength, args.surrounding_region_length, args.oligo_length, args.offset_5_prime)
-
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+def main(args):
+    calculate_accessibility(args.gene_id, args.input_fasta, args.output, args.winsize, args.span, args.ulength, args.surrounding_region_length, args.oligo_length, args.offset_5_prime, args.fasta_index, record_from_args(args))
@@ -0,0 +1,97 @@
+"""Aggregate the merged results of all genes of a run into one indexed SQLite database."""
+
+import csv
+import json
+import os
+import sys
+
+from .crossreactivity import hit_column_suffixes
+from .io_utils import open_text
+from .results_db import HIT_COLUMNS, INDEXES, OLIGO_COLUMNS, SCHEMA, connect, convert, split_oligo_id
+
+def load_merged_table(conn, merged_path, default_reference=""):
+    """
+    Streams one merged results table into the oligos and hits tables, with one
+    hit row per reference. The unsuffixed hit columns of single-reference runs
+    are recorded under the default reference.
+    """
+    oligo_rows = {}
+    hit_rows = []
+    with open_text(merged_path, newline='') as f:
+        reader = csv.DictReader(f, delimiter='\t')
+        references = [
+            (suffix[1:] if suffix else default_reference, suffix)
+            for suffix in hit_column_suffixes(reader.fieldnames or [])
+        ]
+        for row in reader:
+            oligo_id = row['#ID']
+            if oligo_id not in oligo_rows:
+                gene_id, position = split_oligo_id(oligo_id)
+                oligo_rows[oligo_id] = [gene_id, position] + [
+                    convert(row.get(column), kind) for column, _, kind in OLIGO_COLUMNS
+                ]
+            for reference, suffix in references:
+                hits = {
+                    column: convert(row.get(column if column == 'mismatch_level' else f"{column}{suffix}"), kind)
+                    for column, kind in HIT_COLUMNS
+                }
+                # References without a hit at this mismatch level have no row, as in single-reference runs
+                if hits['num_of_matched_accessions']:
+                    hit_rows.append([oligo_id, reference] + list(hits.values()))
+
+    oligo_placeholders = ', '.join('?' * (len(OLIGO_COLUMNS) + 2))
+    hit_placeholders = ', '.join('?' * (len(HIT_COLUMNS) + 2))
+    conn.executemany(f"INSERT OR REPLACE INTO oligos VALUES ({oligo_placeholders})", oligo_rows.values())
+    conn.executemany(f"INSERT OR REPLACE INTO hits VALUES ({hit_placeholders})", hit_rows)
+
+def read_merged_list(merged_list):
+    """Reads the paths of the merged tables, one per line."""
+    with open(merged_list, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+def aggregate_results(merged_paths, output_db, run_metadata=None, default_reference=""):
+    """Loads the merged tables of all genes into a new SQLite database and indexes it."""
+    if os.path.exists(output_db):
+        os.remove(output_db)
+    conn = connect(output_db, must_exist=False)
+    # The database is built from scratch in the task directory, durability is not needed
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.executescript(SCHEMA)
+
+    if run_metadata:
+        try:
+            with open(run_metadata, 'r') as f:
+                metadata = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"Error reading run metadata {run_metadata}: {e}", file=sys.stderr)
+            sys.exit(1)
+        conn.executemany(
+            "INSERT OR REPLACE INTO run_metadata VALUES (?, ?)",
+            [(key, json.dumps(value)) for key, value in metadata.items()]
+        )
+
+    with conn:
+        for merged_path in merged_paths:
+            try:
+                load_merged_table(conn, merged_path, default_reference)
+            except (OSError, KeyError, ValueError) as e:
+                print(f"Error loading merged table {merged_path}: {e}", file=sys.stderr)
+                sys.exit(1)
+
+    conn.executescript(INDEXES)
+    conn.execute("ANALYZE")
+    conn.close()
+
+def add_arguments(parser):
+    parser.add_argument("--merged", nargs='*', default=[], help="Merged results TSV files.")
+    parser.add_argument("--merged_list", help="File listing the merged results TSV files, one per line.")
+    parser.add_argument("--run_metadata", help="Run metadata JSON file to record in the database.")
+    parser.add_argument("--default_reference", default="", help="Reference name of the unsuffixed hit columns of single-reference runs.")
+    parser.add_argument("--output", required=True, help="Output SQLite database file.")
+
+def main(args):
+    merged_paths = list(args.merged)
+    if args.merged_list:
+        merged_paths += read_merged_list(args.merged_list)
+    aggregate_results(merged_paths, args.output, args.run_metadata, args.default_reference)
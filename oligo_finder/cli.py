@@ -0,0 +1,55 @@
+"""
+Single entry point for all oligo-finder commands.
+
+Only the module of the requested command is imported, and heavy libraries
+(pandas, RNA) are imported inside the functions that need them, so that the
+thousands of short tasks of a run do not pay for imports they never use.
+"""
+
+import argparse
+import importlib
+import sys
+
+from . import __version__
+
+# Command name -> (module, description)
+COMMANDS = {
+    "index-fasta": ("oligo_finder.fasta", "Build an offset index over a multi-FASTA file."),
+    "generate": ("oligo_finder.generate", "Generate sequences and metadata from a FASTA file."),
+    "accessibility": ("oligo_finder.accessibility", "Calculate target accessibility of RNA sequences."),
+    "structure": ("oligo_finder.structure", "Score the oligo self-structure and duplex end stability with ViennaRNA."),
+    "parse-sam": ("oligo_finder.parse_sam", "Parse a SAM file to a structured JSON format."),
+    "crossreactivity": ("oligo_finder.crossreactivity", "Generate a TSV report from a parsed SAM JSON file."),
+    "merge": ("oligo_finder.merge", "Merge filtered metadata and cross-reactivity reports."),
+    "update-merged": ("oligo_finder.update_merged", "Replace the structure scores of a merged table reused from a previous run."),
+    "filter": ("oligo_finder.filter", "Filter sequences by GC content, microRNA hits, and forbidden motifs."),
+    "report": ("oligo_finder.report", "Generate chemically-modified format of the oligos for production and emerge with the final TSV report."),
+    "aggregate": ("oligo_finder.aggregate", "Aggregate the merged results of all genes into one indexed SQLite database."),
+    "query": ("oligo_finder.query", "Query the run-level results database for the best oligos across genes."),
+    "export": ("oligo_finder.export", "Export the final XLSX report of one gene from the run-level results database."),
+    "lookup": ("oligo_finder.lookup", "Look up the accessions of an oligo in a parsed SAM JSON file."),
+}
+
+def build_parser(command=None):
+    """
+    Builds the argument parser. Arguments are only registered for the given
+    command so that no other command module needs to be imported.
+    """
+    parser = argparse.ArgumentParser(prog="oligo-finder", description="OLIGO-FINDER-NF command line tools.")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    subparsers = parser.add_subparsers(dest="command", metavar="<command>", required=True)
+
+    for name, (module_name, description) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=description, description=description)
+        if name == command:
+            module = importlib.import_module(module_name)
+            module.add_arguments(subparser)
+            subparser.set_defaults(func=module.main)
+    return parser
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = next((arg for arg in argv if not arg.startswith("-")), None)
+    parser = build_parser(command)
+    args = parser.parse_args(argv)
+    args.func(args)
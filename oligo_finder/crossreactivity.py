@@ -0,0 +1,79 @@
+"""Generate the cross-reactivity TSV report from a parsed SAM JSON file."""
+
+import json
+import csv
+import sys
+
+from .io_utils import open_text
+from .parse_sam import MAX_RECORDED
+
+# Hit columns of the report, suffixed per reference when several are screened
+HIT_COLUMN_NAMES = ['num_of_matched_geneids', 'num_of_matched_accessions', 'matched_geneid', 'matched_accession']
+
+def hit_column_suffixes(columns):
+    """Returns the reference suffixes of the hit columns of a (merged) report, in column order."""
+    prefix = HIT_COLUMN_NAMES[0]
+    return [column[len(prefix):] for column in columns if column.startswith(prefix)]
+
+def format_names(names, count, empty):
+    """Joins the recorded names, which parse_sam only keeps up to MAX_RECORDED."""
+    if count > MAX_RECORDED or names is None:
+        return 'too_many_to_record'
+    return ','.join(names) if names else empty
+
+def generate_report(json_file_path, output_tsv_path, column_suffix=""):
+    """
+    Reads a JSON file from the parse_sam step and generates a final
+    tab-separated report with the specified format. The column suffix
+    distinguishes the hit columns of multiple references once merged.
+    """
+
+    # Read and parse the JSON file
+    parsed_data = {}
+    try:
+        with open_text(json_file_path) as f:
+            parsed_data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Error reading or parsing JSON file {json_file_path}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    # Open the output TSV file for writing
+    with open_text(output_tsv_path, 'w', newline='') as f_out:
+        writer = csv.writer(f_out, delimiter='\t')
+
+        # Write the new, corrected header
+        writer.writerow(['#ID', 'mismatch_level'] + [f"{column}{column_suffix}" for column in HIT_COLUMN_NAMES])
+
+        # Iterate through each oligo in the JSON data
+        for oligo_id, data in parsed_data.items():
+
+            # Iterate through each mismatch level for the current oligo
+            # The keys are strings in JSON, so we sort them numerically
+            sorted_mismatch_levels = sorted(data.get('mismatch_level', {}).keys(), key=int)
+
+            for mismatch_level in sorted_mismatch_levels:
+                mismatch_info = data['mismatch_level'][mismatch_level]
+
+                # The gene ID mapping and counting is already done by parse_sam
+                num_of_matched_geneids = mismatch_info['num_of_geneids']
+                matched_geneid = format_names(mismatch_info.get('geneids'), num_of_matched_geneids, 'NA')
+                num_of_matched_accessions = mismatch_info['num_of_accessions']
+                matched_accession = format_names(mismatch_info.get('accessions'), num_of_matched_accessions, '')
+
+                # Write the final row with the new column order
+                writer.writerow([
+                    oligo_id,
+                    mismatch_level,
+                    num_of_matched_geneids,
+                    num_of_matched_accessions,
+                    matched_geneid,
+                    matched_accession
+                ])
+
+def add_arguments(parser):
+    parser.add_argument("--json", required=True, help="Input JSON file path.")
+    parser.add_argument("--output", required=True, help="Output TSV file path.")
+    parser.add_argument("--column_suffix", default="", help="Suffix of the hit columns, e.g. '_mouse' when screening several references.")
+
+def main(args):
+    generate_report(args.json, args.output, args.column_suffix)
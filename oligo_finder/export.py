@@ -0,0 +1,114 @@
+"""Export the final XLSX report of one gene on demand from the run-level results database."""
+
+import json
+import sys
+
+from .crossreactivity import HIT_COLUMN_NAMES
+from .filter import filter_sequences
+from .merge import merge_crossreactivity_reports
+from .report import format_final_report, write_final_report
+from .results_db import HIT_COLUMNS, OLIGO_COLUMNS, connect, load_references
+from .structure import replace_structure_columns, score_oligos
+
+# Run metadata keys used as defaults of the export options
+METADATA_DEFAULTS = ['sense_length', 'antisense_length', 'min_gc', 'max_gc', 'microrna_hits_threshold', 'forbidden_motifs']
+
+def load_gene_results(conn, gene_id):
+    """
+    Rebuilds the merged results table of a gene from the database, with the
+    hit columns of each reference side by side as MERGE_RESULTS writes them.
+    """
+    import pandas as pd
+
+    oligo_columns = [f"o.{column} AS \"{name}\"" for name, column, _ in OLIGO_COLUMNS]
+    oligos = pd.read_sql_query(
+        f"SELECT {', '.join(oligo_columns)} FROM oligos o WHERE o.gene_id = ? ORDER BY o.position",
+        conn, params=[gene_id]
+    )
+    hit_columns = [f"h.{column}" for column, _ in HIT_COLUMNS]
+    hits = pd.read_sql_query(
+        f"""
+        SELECT h.oligo_id AS "#ID", h.reference, {', '.join(hit_columns)}
+        FROM oligos o
+        JOIN hits h ON h.oligo_id = o.oligo_id
+        WHERE o.gene_id = ?
+        ORDER BY o.position, h.mismatch_level
+        """,
+        conn, params=[gene_id]
+    )
+
+    reports = [
+        hits[hits['reference'] == reference]
+            .drop(columns='reference')
+            .rename(columns={column: f"{column}{suffix}" for column in HIT_COLUMN_NAMES})
+        for reference, suffix in load_references(conn)
+    ]
+    if not reports:
+        crossreactivity_report = hits.drop(columns='reference')
+    elif len(reports) == 1:
+        crossreactivity_report = reports[0]
+    else:
+        crossreactivity_report = merge_crossreactivity_reports(reports, oligos['#ID'])
+    return pd.merge(oligos, crossreactivity_report, on="#ID", how="right")
+
+def load_run_metadata(conn):
+    """Loads the run metadata recorded in the database."""
+    return {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM run_metadata")}
+
+def export_gene_report(db_path, gene_id, output_xlsx, filtered=False, **options):
+    """
+    Writes the complete (or filtered) final report of a gene. Options that are
+    not given fall back to the parameters recorded in the run metadata.
+    """
+    conn = connect(db_path)
+    metadata = load_run_metadata(conn)
+    settings = {key: options.get(key) if options.get(key) is not None else metadata.get(key) for key in METADATA_DEFAULTS}
+    missing = [key for key in ['sense_length', 'antisense_length'] if settings[key] is None]
+    if filtered:
+        missing += [key for key in ['min_gc', 'max_gc', 'microrna_hits_threshold'] if settings[key] is None]
+    if missing:
+        print(f"Error: {', '.join(missing)} not recorded in {db_path}, provide them as options.", file=sys.stderr)
+        sys.exit(1)
+
+    df = load_gene_results(conn, gene_id)
+    conn.close()
+    if df.empty:
+        print(f"Error: Gene {gene_id} not found in {db_path}.", file=sys.stderr)
+        sys.exit(1)
+
+    # The structure scores depend on the strand lengths, rescore them for other lengths than the run's
+    sense_length, antisense_length = int(settings['sense_length']), int(settings['antisense_length'])
+    if (sense_length, antisense_length) != (metadata.get('sense_length'), metadata.get('antisense_length')):
+        scores = score_oligos(set(df['Oligo']), sense_length, antisense_length)
+        df = replace_structure_columns(df, {oligo: tuple(round(value, 2) for value in score) for oligo, score in scores.items()})
+
+    if filtered:
+        df = filter_sequences(
+            df, float(settings['min_gc']), float(settings['max_gc']),
+            int(settings['microrna_hits_threshold']), settings['forbidden_motifs'] or ""
+        )
+    df = format_final_report(df, sense_length, antisense_length)
+    write_final_report(df, output_xlsx)
+
+def add_arguments(parser):
+    parser.add_argument("--db", required=True, help="Path to the run-level results SQLite database.")
+    parser.add_argument("--gene_id", required=True, help="Gene ID to export.")
+    parser.add_argument("--output_xlsx", required=True, help="Path to the output XLSX file.")
+    parser.add_argument("--filtered", action="store_true", help="Export the filtered instead of the complete report.")
+    parser.add_argument("--sense_length", type=int, help="Length of the sense strand (default: run parameter).")
+    parser.add_argument("--antisense_length", type=int, help="Length of the antisense strand (default: run parameter).")
+    parser.add_argument("--min_gc", type=float, help="Minimum GC content percentage (default: run parameter).")
+    parser.add_argument("--max_gc", type=float, help="Maximum GC content percentage (default: run parameter).")
+    parser.add_argument("--microrna_hits_threshold", type=int, help="Maximum allowed microRNA hits (default: run parameter).")
+    parser.add_argument("--forbidden_motifs", type=str, help="Comma-separated list of forbidden motifs (default: run parameter).")
+
+def main(args):
+    export_gene_report(
+        args.db, args.gene_id, args.output_xlsx, args.filtered,
+        sense_length=args.sense_length,
+        antisense_length=args.antisense_length,
+        min_gc=args.min_gc,
+        max_gc=args.max_gc,
+        microrna_hits_threshold=args.microrna_hits_threshold,
+        forbidden_motifs=args.forbidden_motifs,
+    )
@@ -0,0 +1,129 @@
+"""Build a .fai-style offset index over a multi-FASTA file and read single records from it."""
+
+import mmap
+import re
+import sys
+from collections import namedtuple
+
+# Columns of the index: the samtools faidx columns, plus the accession (first
+# word of the header) needed to look up the CDS region of the record.
+FastaRecord = namedtuple('FastaRecord', ['gene_id', 'length', 'offset', 'linebases', 'linebytes', 'accession'])
+
+def sanitize_header(header):
+    """
+    Derives the gene ID from a FASTA header. Replaces any character that is NOT
+    alphanumeric, underscore, dot, or hyphen with an underscore.
+    """
+    return re.sub(r'[^a-zA-Z0-9_.-]', '_', header)
+
+def iter_index(fasta_path):
+    """Scans a multi-FASTA file once and yields a FastaRecord for each sequence."""
+    record = None
+    offset = 0
+    with open(fasta_path, 'rb') as f:
+        for line in f:
+            line_bytes = len(line)
+            if line.startswith(b'>'):
+                if record is not None:
+                    yield FastaRecord(**record)
+                header = line[1:].decode().rstrip('\r\n')
+                record = {
+                    'gene_id': sanitize_header(header),
+                    'length': 0,
+                    'offset': offset + line_bytes,
+                    'linebases': 0,
+                    'linebytes': 0,
+                    'accession': header.split()[0] if header.split() else '',
+                }
+            elif record is not None:
+                bases = len(line.rstrip(b'\r\n'))
+                if record['linebases'] == 0:
+                    record['linebases'] = bases
+                    record['linebytes'] = line_bytes
+                record['length'] += bases
+            offset += line_bytes
+    if record is not None:
+        yield FastaRecord(**record)
+
+def build_index(fasta_path, index_path):
+    """Writes the offset index of a multi-FASTA file, one tab-separated line per record."""
+    gene_ids = set()
+    with open(index_path, 'w') as f_out:
+        for record in iter_index(fasta_path):
+            if record.gene_id in gene_ids:
+                print(f"Error: Duplicate FASTA header for gene {record.gene_id} in {fasta_path}.", file=sys.stderr)
+                sys.exit(1)
+            gene_ids.add(record.gene_id)
+            f_out.write('\t'.join(map(str, record)) + '\n')
+
+def find_record(index_path, gene_id):
+    """Looks up the record of a gene in an offset index."""
+    try:
+        with open(index_path, 'r') as f:
+            for line in f:
+                parts = line.rstrip('\n').split('\t')
+                if parts[0] == gene_id:
+                    return FastaRecord(parts[0], *map(int, parts[1:5]), parts[5])
+    except OSError as e:
+        print(f"Error: Cannot read FASTA index {index_path}: {e.strerror}.", file=sys.stderr)
+        sys.exit(1)
+    print(f"Error: Gene {gene_id} not found in FASTA index {index_path}.", file=sys.stderr)
+    sys.exit(1)
+
+def fetch_sequence(fasta_path, record):
+    """Reads the sequence of one record by its offset from the memory-mapped FASTA file."""
+    with open(fasta_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        end = mm.find(b'>', record.offset)
+        data = mm[record.offset:end if end != -1 else len(mm)]
+    sequence = b''.join(data.split()).decode()
+    if len(sequence) != record.length:
+        print(f"Error: FASTA index is out of date for gene {record.gene_id} in {fasta_path}.", file=sys.stderr)
+        sys.exit(1)
+    return sequence
+
+def parse_fasta(fasta_path):
+    """Reads a single-record FASTA file, returning its accession and sequence."""
+    sequence = []
+    accession = ""
+    with open(fasta_path, 'r') as f_in:
+        for line in f_in:
+            if line.startswith('>'):
+                accession = line[1:].strip().split()[0]
+            else:
+                sequence.append(line.strip())
+    return accession, "".join(sequence)
+
+def load_record(fasta_path, gene_id=None, index_path=None, record=None):
+    """
+    Returns the accession and sequence of a gene, either by random access to
+    a multi-FASTA file, at the given record or at the one of the gene in the
+    offset index, or from a single-record FASTA file otherwise.
+    """
+    if record is None and index_path:
+        record = find_record(index_path, gene_id)
+    if record is not None:
+        return record.accession, fetch_sequence(fasta_path, record)
+    return parse_fasta(fasta_path)
+
+def add_record_arguments(parser):
+    """Adds the options locating a gene in a multi-FASTA file, shared by the per-gene commands."""
+    parser.add_argument("--fasta_index", help="Offset index of a multi-FASTA input file (see index-fasta).")
+    parser.add_argument("--offset", type=int, help="Offset of the gene's sequence in a multi-FASTA input file, instead of --fasta_index.")
+    parser.add_argument("--length", type=int, help="Length of the gene's sequence, with --offset.")
+    parser.add_argument("--accession", default="", help="Accession of the gene (first word of its header), with --offset.")
+
+def record_from_args(args):
+    """Returns the record given by --offset, --length and --accession, or None without --offset."""
+    if args.offset is None:
+        return None
+    if args.length is None:
+        print("Error: --length is required with --offset.", file=sys.stderr)
+        sys.exit(1)
+    return FastaRecord(args.gene_id, args.length, args.offset, 0, 0, args.accession)
+
+def add_arguments(parser):
+    parser.add_argument("--input_fasta", required=True, help="Input multi-FASTA file.")
+    parser.add_argument("--output", required=True, help="Output offset index file.")
+
+def main(args):
+    build_index(args.input_fasta, args.output)
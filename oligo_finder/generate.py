@@ -1,42 +1,40 @@
-#!/usr/bin/env python
+"""Generate oligo candidates and their metadata from a target gene FASTA file."""
 
-import argparse
 import sys
-import pandas as pd
 
-def calculate_gc(seq):
-    """Calculates the GC content of a DNA sequence."""
-    if not seq:
-        return 0.0
-    gc_count = sum(base in ('G', 'C') for base in seq)
-    return (gc_count / len(seq)) * 100
-
-def reverse_complement(seq):
-    """Generates the reverse complement of a DNA sequence."""
-    complement = {'A': 'T', 'T': 'A', 'C': 'G', 'G': 'C', 'N': 'N'}
-    return "".join(complement.get(base, base) for base in reversed(seq.upper()))
-
-def convert_dna_to_rna(seq):
-    """Converts a DNA sequence to an RNA sequence by replacing T with U."""
-    return seq.upper().replace('T', 'U')
+from .fasta import add_record_arguments, load_record, record_from_args
+from .io_utils import open_text
+from .seq_utils import calculate_gc, convert_dna_to_rna, reverse_complement
 
 def load_weight_matrix(weight_matrix_file):
-    """Loads a weight matrix from a file into a pandas DataFrame."""
+    """
+    Loads a weight matrix from a TSV file into a dictionary of
+    {position: {nucleotide: weight}}.
+    """
+    weight_matrix = {}
     try:
-        weight_matrix = pd.read_csv(weight_matrix_file, sep='\t', index_col=0)
+        with open(weight_matrix_file, 'r') as f:
+            nucleotides = f.readline().rstrip('\r\n').split('\t')[1:]
+            for line in f:
+                if not line.strip():
+                    continue
+                parts = line.rstrip('\r\n').split('\t')
+                weight_matrix[int(parts[0])] = {
+                    nucleotide: float(weight) for nucleotide, weight in zip(nucleotides, parts[1:])
+                }
     except Exception as e:
         print(f"Error loading weight matrix file: {e}", file=sys.stderr)
         sys.exit(1)
     return weight_matrix
 
 def calc_seq_score(seq, weight_matrix):
-    """Calculates a score for the sequence based on a provided weight matrix."""
+    """Calculates a score for the sequence based on a loaded weight matrix."""
     seq = convert_dna_to_rna(seq)
-    weight_matrix = load_weight_matrix(weight_matrix)
     score = 0.0
     for i, nucleotide in enumerate(seq):
-        if nucleotide in weight_matrix.columns:
-            score += weight_matrix.loc[i + 1, nucleotide]
+        weights = weight_matrix.get(i + 1, {})
+        if nucleotide in weights:
+            score += weights[nucleotide]
         else:
             print(f"Warning: Nucleotide '{nucleotide}' at position {i} not found in weight matrix.", file=sys.stderr)
     return score
@@ -52,9 +50,8 @@ def load_microrna_seeds(microrna_seeds_file):
     return seeds
 
 def calc_microrna_hits(seq, microrna_seeds):
-    """Calculates the number of microRNA seed matches in the sequence."""
+    """Calculates the number of microRNA seed matches in the sequence against a loaded seed set."""
     seq = convert_dna_to_rna(seq)
-    microrna_seeds = load_microrna_seeds(microrna_seeds)
 
     hit_count = 0
     seed_length = len(next(iter(microrna_seeds))) if microrna_seeds else 0
@@ -84,27 +81,23 @@ def load_cds_regions(cds_region_file):
 
 def generate_sequences(input_fasta, output, gene_id, surrounding_region_length, 
                     offset_5_prime, oligo_length, offset_refseq_seed, refseq_seed_length, 
-                    offset_microrna, microrna_seed_length, weight_matrix, microrna_seeds, cds_region_file):
+                    offset_microrna, microrna_seed_length, weight_matrix, microrna_seeds, cds_region_file,
+                    fasta_index=None, record=None):
     # sourcery skip: low-code-quality
     """
     Reads a FASTA file, extracts the surrounding region of specified length,
     and writes it to an output FASTA file.
     """
-    # Load CDS regions
+    # Load CDS regions, weight matrix and microRNA seeds once for all windows
     cds_regions = load_cds_regions(cds_region_file)
+    weight_matrix = load_weight_matrix(weight_matrix)
+    microrna_seeds = load_microrna_seeds(microrna_seeds)
     
-    # --- Read the input FASTA file ---
-    sequence = ""
-    accession = ""
-    with open(input_fasta, 'r') as f_in:
-        for line in f_in:
-            if line.startswith('>'):
-                accession = line[1:].strip().split()[0]
-                if accession not in cds_regions:
-                    print(f"Error: Accession {accession} not found in CDS regions file.", file=sys.stderr)
-                    sys.exit(1)
-            else:
-                sequence += line.strip()
+    # --- Read the gene from the input FASTA file ---
+    accession, sequence = load_record(input_fasta, gene_id, fasta_index, record)
+    if accession not in cds_regions:
+        print(f"Error: Accession {accession} not found in CDS regions file.", file=sys.stderr)
+        sys.exit(1)
 
     if not sequence:
         print(f"Error: No sequence found in {input_fasta}", file=sys.stderr)
@@ -118,8 +111,10 @@ def generate_sequences(input_fasta, output, gene_id, surrounding_region_length,
     end = len(sequence) - surrounding_region_length + 1
     
     # --- Write to output metadata file ---
-    header = "#ID\tSurrounding_Region\tOligo\tRegion\tGC_Content\tRefseq_Seed\tOligo_RC\tMicroRNA_Seed\tMicroRNA_Hits\tScore\n"
-    with open(output, 'w') as f_out:
+    # The reverse complement and microRNA seed are derived from the oligo and
+    # are recomputed downstream where needed instead of being stored.
+    header = "#ID\tSurrounding_Region\tOligo\tRegion\tGC_Content\tRefseq_Seed\tMicroRNA_Hits\tScore\n"
+    with open_text(output, 'w') as f_out:
         f_out.write(header)
         for i in range(end):
             # Generate a unique ID
@@ -163,8 +158,6 @@ def generate_sequences(input_fasta, output, gene_id, surrounding_region_length,
                 region,
                 f"{gc_oligo:.2f}",
                 refseq_seed,
-                oligo_rc,
-                microrna_seed,
                 microrna_hits,
                 score
             ]
@@ -173,9 +166,9 @@ def generate_sequences(input_fasta, output, gene_id, surrounding_region_length,
             # Write the output string to the file
             f_out.write(output_str)
 
-def main():
-    parser = argparse.ArgumentParser(description="Generate sequences and metadata from a FASTA file.")
+def add_arguments(parser):
     parser.add_argument("--input_fasta", required=True, help="Input FASTA file")
+    add_record_arguments(parser)
     parser.add_argument("--gene_id", required=True, help="Gene ID/accession")
     parser.add_argument("--output", required=True, help="Output metadata file")
     parser.add_argument("--surrounding_region_length", type=int, required=True, help="Length of surrounding region")
@@ -188,8 +181,8 @@ def main():
     parser.add_argument("--weight_matrix", type=str, required=True, help="Weight matrix file")
     parser.add_argument("--microrna_seeds", type=str, required=True, help="MicroRNA seeds file")
     parser.add_argument("--cds_region", type=str, required=True, help="CDS region file")
-    args = parser.parse_args()
 
+def main(args):
     generate_sequences(
         args.input_fasta, 
         args.output, 
@@ -203,10 +196,7 @@ def main():
         args.microrna_seed_length,
         args.weight_matrix,
         args.microrna_seeds,
-        args.cds_region
+        args.cds_region,
+        args.fasta_index,
+        record_from_args(args)
     )
-
-if __name__ == "__main__":
-    main()
-    
-
@@ -0,0 +1,67 @@
+"""Shared I/O helpers for the oligo-finder commands."""
+
+import gzip
+import sys
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+
+def detect_compression(path):
+    """Detects the compression of an existing file from its magic bytes."""
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic.startswith(GZIP_MAGIC):
+        return "gzip"
+    if magic.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return "none"
+
+def compression_from_suffix(path):
+    """Derives the compression of a file to be written from its extension."""
+    for suffix, compression in COMPRESSION_SUFFIXES.items():
+        if str(path).endswith(suffix):
+            return compression
+    return "none"
+
+def open_text(path, mode="r", newline=None):
+    """
+    Opens a plain, gzip or zstd compressed text file for streaming.
+
+    When reading, the compression is detected from the file content, so staged
+    files can be read regardless of their name. When writing, the compression
+    is chosen from the file extension ('.gz' or '.zst').
+    """
+    if "r" in mode:
+        compression = detect_compression(path)
+    else:
+        compression = compression_from_suffix(path)
+    text_mode = mode.replace("t", "") + "t"
+
+    if compression == "gzip":
+        return gzip.open(path, text_mode, compresslevel=6, newline=newline)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            print(f"Error: Reading or writing {path} requires the 'zstandard' package.", file=sys.stderr)
+            sys.exit(1)
+        return zstandard.open(path, text_mode, newline=newline)
+    return open(path, mode, newline=newline)
+
+def read_table(path, **kwargs):
+    """Loads a (possibly compressed) TSV file into a pandas DataFrame."""
+    import pandas as pd
+
+    try:
+        with open_text(path) as f:
+            return pd.read_csv(f, sep="\t", **kwargs)
+    except Exception as e:
+        print(f"Error loading file {path}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def write_table(df, path):
+    """Writes a pandas DataFrame to a (possibly compressed) TSV file."""
+    with open_text(path, "w", newline="") as f_out:
+        df.to_csv(f_out, sep="\t", index=False)
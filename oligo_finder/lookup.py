@@ -1,9 +1,10 @@
-#!/usr/bin/env python
+"""Look up the accessions of an oligo and mismatch level in a parsed SAM JSON file."""
 
 import json
-import argparse
 import sys
 
+from .io_utils import open_text
+
 def get_accessions(json_file_path, data_id, mismatch_level):
     """
     Looks up accessions in a JSON file based on an ID and mismatch level.
@@ -14,14 +15,19 @@ def get_accessions(json_file_path, data_id, mismatch_level):
         mismatch_level (str): The mismatch level to search for (e.g., '0').
 
     Returns:
-        list: A list of accession strings if found, otherwise None.
+        list: A list of accession strings if found, otherwise None. Only up to
+        the parse_sam recording cap of accessions are stored by name.
     """
     try:
-        with open(json_file_path, 'r') as f:
+        with open_text(json_file_path) as f:
             data = json.load(f)
         
         # Navigate through the nested dictionary to find the accessions
-        return data[data_id]['mismatch_level'][mismatch_level]['accessions']
+        level = data[data_id]['mismatch_level'][mismatch_level]
+        if 'accessions' not in level:
+            print(f"Error: {level['num_of_accessions']} accessions matched, too many to record.", file=sys.stderr)
+            return None
+        return level['accessions']
 
     except FileNotFoundError:
         print(f"Error: The file '{json_file_path}' was not found.", file=sys.stderr)
@@ -33,18 +39,12 @@ def get_accessions(json_file_path, data_id, mismatch_level):
         print(f"Error: The file '{json_file_path}' is not a valid JSON file.", file=sys.stderr)
         return None
 
-if __name__ == "__main__":
-    # Set up the command-line argument parser
-    parser = argparse.ArgumentParser(
-        description="A simple script to look up accessions in a JSON file."
-    )
+def add_arguments(parser):
     parser.add_argument("--json", help="Path to the input JSON file.")
     parser.add_argument("--id", help="The ID to look up (e.g., 16).")
     parser.add_argument("--mismatch_level", help="The mismatch level (e.g., 0).")
 
-    args = parser.parse_args()
-
-    # Call the function with command-line arguments
+def main(args):
     result = get_accessions(args.json, args.id, args.mismatch_level)
 
     # Print the results to the console
@@ -53,4 +53,4 @@ if __name__ == "__main__":
             print(accession)
     else:
         # Error messages are printed from within the function
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
@@ -0,0 +1,66 @@
+"""Merge the sequence metadata, target accessibility, oligo structure and cross-reactivity reports of a gene."""
+
+from functools import reduce
+
+from .io_utils import read_table, write_table
+from .structure import read_structure_scores, replace_structure_columns
+
+def merge_crossreactivity_reports(reports, oligo_ids):
+    """
+    Merges the cross-reactivity reports of several references side by side on
+    the oligo ID and mismatch level. A mismatch level hit in one reference but
+    not in another has no matches in the latter. Rows keep the oligo order.
+    """
+    import pandas as pd
+
+    merged = reduce(
+        lambda left, right: pd.merge(left, right, on=["#ID", "mismatch_level"], how="outer"),
+        reports
+    )
+    for column in merged.columns:
+        if column.startswith(("num_of_matched_geneids", "num_of_matched_accessions")):
+            merged[column] = merged[column].fillna(0).astype(int)
+        elif column.startswith("matched_geneid"):
+            merged[column] = merged[column].fillna("NA")
+        elif column.startswith("matched_accession"):
+            merged[column] = merged[column].fillna("")
+    order = {oligo_id: i for i, oligo_id in enumerate(oligo_ids)}
+    merged["_order"] = merged["#ID"].map(order)
+    return merged.sort_values(["_order", "mismatch_level"]).drop(columns="_order")
+
+def merge_results(filtered_metadata_path, crossreactivity_report_paths, target_accessibility_path, output_path, oligo_structure_path=None):
+    import pandas as pd
+
+    # Load the filtered metadata and cross-reactivity reports
+    filtered_metadata = read_table(filtered_metadata_path)
+    crossreactivity_reports = [read_table(path) for path in crossreactivity_report_paths]
+    target_accessibility = read_table(target_accessibility_path)
+
+    if len(crossreactivity_reports) == 1:
+        crossreactivity_report = crossreactivity_reports[0]
+    else:
+        crossreactivity_report = merge_crossreactivity_reports(crossreactivity_reports, filtered_metadata["#ID"])
+
+    # Merge the two DataFrames on the 'ID' column
+    merged = pd.merge(filtered_metadata, crossreactivity_report, on="#ID", how="right")
+    
+    # Merge with target accessibility data
+    merged = pd.merge(merged, target_accessibility, on="#ID", how="left")
+
+    # Add the oligo structure scores, scored once for the group of genes
+    if oligo_structure_path:
+        merged = replace_structure_columns(merged, read_structure_scores(oligo_structure_path))
+
+    # Save the merged DataFrame to the output file
+    write_table(merged, output_path)
+
+
+def add_arguments(parser):
+    parser.add_argument("--filtered_metadata", required=True, help="Path to the filtered metadata TSV file.")
+    parser.add_argument("--crossreactivity_report", required=True, nargs='+', help="Paths to the cross-reactivity report TSV files, one per reference.")
+    parser.add_argument("--target_accessibility", help="Path to the target accessibility TSV file.")
+    parser.add_argument("--oligo_structure", help="Path to the oligo structure scores TSV file of the gene's group (see structure).")
+    parser.add_argument("--output", required=True, help="Path to the output merged TSV file.")
+
+def main(args):
+    merge_results(args.filtered_metadata, args.crossreactivity_report, args.target_accessibility, args.output, args.oligo_structure)
@@ -0,0 +1,188 @@
+"""Parse a Bowtie SAM file into a structured JSON format."""
+
+import json
+import re
+import sys
+
+from .io_utils import open_text
+
+# Accession and gene ID lists are only recorded up to this many names
+MAX_RECORDED = 10
+
+NONZERO_BYTE = re.compile(b'[^\x00]')
+
+class AccessionIndex:
+    """
+    Interns accessions and gene IDs to integers so that hits can be stored as
+    bitsets instead of sets of strings.
+    """
+
+    def __init__(self):
+        self.accession_ids = {}
+        self.accessions = []
+        self.accession_genes = []
+        self.gene_ids = {}
+        self.genes = []
+
+    def intern_gene(self, gene_id):
+        if gene_id not in self.gene_ids:
+            self.gene_ids[gene_id] = len(self.genes)
+            self.genes.append(gene_id)
+        return self.gene_ids[gene_id]
+
+    def intern_accession(self, accession):
+        if accession not in self.accession_ids:
+            self.accession_ids[accession] = len(self.accessions)
+            self.accessions.append(accession)
+            self.accession_genes.append(())
+        return self.accession_ids[accession]
+
+    def add_mapping(self, gene_id, accession):
+        accession_id = self.intern_accession(accession)
+        gene = self.intern_gene(gene_id)
+        if gene not in self.accession_genes[accession_id]:
+            self.accession_genes[accession_id] += (gene,)
+
+def load_geneid_accession_map(geneid_accession_path):
+    """
+    Load the GeneID to accession mapping from a given file into an AccessionIndex.
+    The file is expected to have a header and the GeneID and Accession in the
+    first and third tab-separated columns.
+    """
+    index = AccessionIndex()
+    try:
+        with open(geneid_accession_path, 'r') as f:
+            next(f)  # Skip header line
+            for line in f:
+                parts = line.strip().split('\t')
+                if len(parts) >= 3:
+                    index.add_mapping(parts[0], parts[2])
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    return index
+
+def set_bit(bits, i):
+    """Sets bit i of a bytearray bitset, growing it if needed."""
+    byte = i >> 3
+    if byte >= len(bits):
+        bits.extend(bytes(byte - len(bits) + 1))
+    bits[byte] |= 1 << (i & 7)
+
+def iter_bits(bits):
+    """Yields the indices of the set bits of a bytearray bitset in increasing order."""
+    # Skip the empty bytes in C, bitsets are sparse for all but repetitive seeds
+    for match in NONZERO_BYTE.finditer(bits):
+        byte_index = match.start()
+        byte = bits[byte_index]
+        while byte:
+            low = byte & -byte
+            yield (byte_index << 3) + low.bit_length() - 1
+            byte ^= low
+
+def count_bits(bits):
+    """Counts the set bits of a bytearray bitset."""
+    return int.from_bytes(bits, 'little').bit_count()
+
+def summarize_level(accession_bits, index, max_recorded):
+    """
+    Summarizes the accessions hit at one mismatch level into exact accession and
+    gene ID counts, recording the names only up to max_recorded.
+    """
+    gene_bits = bytearray()
+    for accession_id in iter_bits(accession_bits):
+        for gene in index.accession_genes[accession_id]:
+            set_bit(gene_bits, gene)
+
+    summary = {}
+    for key, bits, names in (
+        ('accessions', accession_bits, index.accessions),
+        ('geneids', gene_bits, index.genes),
+    ):
+        count = count_bits(bits)
+        summary[f'num_of_{key}'] = count
+        if count <= max_recorded:
+            summary[key] = [names[i] for i in iter_bits(bits)]
+    return summary
+
+def summarize_oligo(levels, index, max_recorded):
+    """Summarizes all mismatch levels of an oligo, in increasing mismatch order."""
+    return {
+        'mismatch_level': {
+            mismatch_level: summarize_level(levels[mismatch_level], index, max_recorded)
+            for mismatch_level in sorted(levels)
+        }
+    }
+
+def parse_sam_file(sam_file_path, index=None, max_recorded=MAX_RECORDED):
+    """
+    Parses a Bowtie SAM file and structures the data as a nested dictionary.
+
+    Bowtie reports all alignments of a read consecutively, so the hits of one
+    oligo are accumulated as per-level accession bitsets and summarized as soon
+    as the next oligo starts. Memory is bounded by one oligo's bitsets plus the
+    capped summaries, regardless of how repetitive the seeds are.
+    """
+    if index is None:
+        index = AccessionIndex()
+    oligos = {}
+    current_id = None
+    levels = {}
+
+    with open_text(sam_file_path) as f:
+        for line in f:
+            if line.startswith('@'):
+                continue
+
+            fields = line.strip().split('\t')
+
+            if len(fields) < 11:
+                continue
+
+            oligo_id = fields[0]
+            accession = fields[2]
+
+            # Instead of looping, create a dictionary of the optional tags for instant lookup.
+            tags = {tag.split(':')[0]: tag.split(':')[-1] for tag in fields[11:]}
+
+            num_mismatches_str = tags.get('NM')
+            if not num_mismatches_str:
+                continue
+
+            try:
+                num_mismatches = int(num_mismatches_str)
+            except ValueError:
+                continue
+
+            if oligo_id != current_id:
+                if current_id is not None:
+                    oligos[current_id] = summarize_oligo(levels, index, max_recorded)
+                if oligo_id in oligos:
+                    raise ValueError(f"Alignments of {oligo_id} are not consecutive in {sam_file_path}")
+                current_id = oligo_id
+                levels = {}
+
+            if num_mismatches not in levels:
+                levels[num_mismatches] = bytearray()
+            set_bit(levels[num_mismatches], index.intern_accession(accession))
+
+    if current_id is not None:
+        oligos[current_id] = summarize_oligo(levels, index, max_recorded)
+
+    return oligos
+
+def add_arguments(parser):
+    parser.add_argument("--sam", required=True, help="Input SAM file path.")
+    parser.add_argument("--output", required=True, help="Output JSON file path.")
+    parser.add_argument("--geneid_accession", required=True, help="Convert accessions to GeneID.")
+    parser.add_argument("--max_recorded", type=int, default=MAX_RECORDED, help="Maximum number of accessions and gene IDs to record by name.")
+
+def main(args):
+    index = load_geneid_accession_map(args.geneid_accession)
+    try:
+        parsed_data = parse_sam_file(args.sam, index, args.max_recorded)
+        with open_text(args.output, 'w') as f_out:
+            json.dump(parsed_data, f_out)
+    except Exception as e:
+        print(f"Error processing file {args.sam}: {e}", file=sys.stderr)
+        sys.exit(1)
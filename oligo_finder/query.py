@@ -0,0 +1,147 @@
+"""Query the run-level results database for the best oligos across genes."""
+
+import csv
+import sys
+
+from .io_utils import open_text
+from .results_db import OLIGO_COLUMNS, connect, load_references
+
+ORDER_BY = {
+    'score': 'o.score DESC',
+    'target_accessibility': 'o.target_accessibility DESC',
+    'gc_content': 'o.gc_content ASC',
+    'duplex_asymmetry': 'o.duplex_asymmetry DESC',
+    'position': 'o.gene_id, o.position',
+}
+
+def parse_list(values):
+    """Splits comma-separated values into a list."""
+    return [value.strip() for value in values.split(',') if value.strip()] if values else []
+
+def load_gene_ids(gene_ids, genes_file):
+    """Collects the gene IDs given on the command line and in a file, one per line."""
+    genes = parse_list(gene_ids)
+    if genes_file:
+        try:
+            with open(genes_file, 'r') as f:
+                genes += [line.strip() for line in f if line.strip()]
+        except FileNotFoundError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    return genes
+
+def build_query(args, mismatch_levels, references):
+    """Builds the SQL query and its parameters from the command-line filters."""
+    conditions = []
+    values = []
+
+    genes = load_gene_ids(args.gene_ids, args.genes_file)
+    if genes:
+        conditions.append(f"o.gene_id IN ({', '.join('?' * len(genes))})")
+        values += genes
+    regions = parse_list(args.regions)
+    if regions:
+        conditions.append(f"o.region IN ({', '.join('?' * len(regions))})")
+        values += regions
+    if args.min_gc is not None:
+        conditions.append("o.gc_content >= ?")
+        values.append(args.min_gc)
+    if args.max_gc is not None:
+        conditions.append("o.gc_content <= ?")
+        values.append(args.max_gc)
+    if args.min_score is not None:
+        conditions.append("o.score >= ?")
+        values.append(args.min_score)
+    if args.min_duplex_asymmetry is not None:
+        conditions.append("o.duplex_asymmetry >= ?")
+        values.append(args.min_duplex_asymmetry)
+    if args.min_antisense_mfe is not None:
+        conditions.append("o.antisense_mfe >= ?")
+        values.append(args.min_antisense_mfe)
+    if args.microrna_hits_threshold is not None:
+        conditions.append("o.microrna_hits <= ?")
+        values.append(args.microrna_hits_threshold)
+    for motif in parse_list(args.forbidden_motifs):
+        conditions.append("instr(o.oligo, ?) = 0")
+        values.append(motif.upper())
+    if args.max_matched_geneids is not None:
+        # Oligos without any hit at this mismatch level have no row in the hits table.
+        # Without --reference, the limit applies to every reference.
+        reference_condition = "AND x.reference = ? " if args.reference else ""
+        conditions.append(
+            "NOT EXISTS (SELECT 1 FROM hits x WHERE x.oligo_id = o.oligo_id "
+            f"{reference_condition}AND x.mismatch_level = ? AND x.num_of_matched_geneids > ?)"
+        )
+        values += ([args.reference] if args.reference else []) + [args.mismatch_level, args.max_matched_geneids]
+
+    oligo_columns = [f"o.{column}" for _, column, _ in OLIGO_COLUMNS]
+    # Reference names are restricted to identifiers by the pipeline, they can be quoted as SQL literals
+    level_columns = [
+        f"COALESCE(MAX(CASE WHEN h.reference = '{reference}' AND h.mismatch_level = {level} "
+        f"THEN h.num_of_matched_geneids END), 0) AS num_of_matched_geneids{suffix}_mm{level}"
+        for reference, suffix in references
+        for level in mismatch_levels
+    ]
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    ranked = f"""
+        SELECT o.gene_id, o.position, {', '.join(oligo_columns + level_columns)},
+               ROW_NUMBER() OVER (PARTITION BY o.gene_id ORDER BY {ORDER_BY[args.order_by]}) AS gene_rank
+        FROM oligos o
+        LEFT JOIN hits h ON h.oligo_id = o.oligo_id
+        {where}
+        GROUP BY o.oligo_id
+    """
+    query = f"SELECT * FROM ({ranked}) o"
+    if args.per_gene is not None:
+        query += " WHERE o.gene_rank <= ?"
+        values.append(args.per_gene)
+    query += f" ORDER BY {ORDER_BY[args.order_by]}"
+    if args.limit is not None:
+        query += " LIMIT ?"
+        values.append(args.limit)
+    return query, values
+
+def query_results(args):
+    """Runs the query and writes the matching oligos as TSV."""
+    conn = connect(args.db)
+    mismatch_levels = [row[0] for row in conn.execute("SELECT DISTINCT mismatch_level FROM hits ORDER BY mismatch_level")]
+    references = load_references(conn)
+    if args.reference and args.reference not in [reference for reference, _ in references]:
+        print(f"Error: Reference {args.reference} not found in {args.db}.", file=sys.stderr)
+        sys.exit(1)
+    query, values = build_query(args, mismatch_levels, references)
+    cursor = conn.execute(query, values)
+    header = [description[0] for description in cursor.description]
+
+    f_out = open_text(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        writer = csv.writer(f_out, delimiter='\t')
+        writer.writerow(header)
+        writer.writerows(cursor)
+    finally:
+        if args.output:
+            f_out.close()
+    conn.close()
+
+def add_arguments(parser):
+    parser.add_argument("--db", required=True, help="Path to the run-level results SQLite database.")
+    parser.add_argument("--gene_ids", help="Comma-separated list of gene IDs to query.")
+    parser.add_argument("--genes_file", help="File with gene IDs to query, one per line.")
+    parser.add_argument("--regions", help="Comma-separated list of regions (e.g. CDS,3UTR).")
+    parser.add_argument("--min_gc", type=float, help="Minimum GC content percentage.")
+    parser.add_argument("--max_gc", type=float, help="Maximum GC content percentage.")
+    parser.add_argument("--min_score", type=float, help="Minimum score.")
+    parser.add_argument("--min_duplex_asymmetry", type=float, help="Minimum duplex end asymmetry (kcal/mol, antisense 5' dG - 3' dG).")
+    parser.add_argument("--min_antisense_mfe", type=float, help="Minimum antisense self-folding MFE (kcal/mol), to exclude strongly structured guides.")
+    parser.add_argument("--microrna_hits_threshold", type=int, help="Maximum allowed microRNA hits.")
+    parser.add_argument("--forbidden_motifs", help="Comma-separated list of forbidden motifs.")
+    parser.add_argument("--mismatch_level", type=int, default=0, help="Mismatch level of the --max_matched_geneids filter.")
+    parser.add_argument("--max_matched_geneids", type=int, help="Maximum number of matched gene IDs at --mismatch_level.")
+    parser.add_argument("--reference", help="Reference of the --max_matched_geneids filter (default: all references).")
+    parser.add_argument("--order_by", choices=sorted(ORDER_BY), default='score', help="Ranking of the oligos.")
+    parser.add_argument("--per_gene", type=int, help="Keep only the best N oligos of each gene.")
+    parser.add_argument("--limit", type=int, help="Maximum number of oligos to return.")
+    parser.add_argument("--output", help="Output TSV file (default: standard output).")
+
+def main(args):
+    query_results(args)
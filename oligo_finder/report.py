@@ -1,7 +1,11 @@
-#!/usr/bin/env python
+"""Generate the chemically-modified synthesis format of the oligos and write the final XLSX report."""
+
 import sys
-import argparse
-import pandas as pd
+
+from .crossreactivity import hit_column_suffixes
+from .io_utils import read_table
+from .structure import STRUCTURE_COLUMNS
+from .seq_utils import reverse_complement
 
 def order_oligo_sense_no_tripurine(oligo, sense_length):
     """
@@ -186,13 +190,12 @@ def order_oligo_antisense_fm(revcomp, antisense_length):
             
     return "PmU." + "".join(mod_nuc_parts)
 
-def generate_final_report(report_tsv, sense_length, antisense_length, output_xlsx):
-    # Load the report TSV
-    try:
-        df = pd.read_csv(report_tsv, sep="\t")
-    except Exception as e:
-        print(f"Error loading file {report_tsv}: {e}", file=sys.stderr)
-        sys.exit(1)
+def format_final_report(df, sense_length, antisense_length):
+    """Adds the synthesis formats to a merged results DataFrame and orders its columns for the final report."""
+    import pandas as pd
+
+    # The reverse complement is not stored in the intermediates, recompute it from the oligo
+    df['Oligo_RC'] = df['Oligo'].apply(reverse_complement)
 
     # Apply the conversion functions to each row
     df['Sense_Tripurine'] = df['Oligo'].replace("U", "T").apply(lambda x: order_oligo_sense(x, sense_length))
@@ -216,32 +219,45 @@ def generate_final_report(report_tsv, sense_length, antisense_length, output_xls
     'Refseq_Seed',
     'Score',
     'Target_Accessibility',
+    ]
+    # Merged tables of runs predating the structure scores do not have them
+    new_column_order += [column for column in STRUCTURE_COLUMNS if column in df.columns]
+    new_column_order += [
     'MicroRNA_Hits',
     'mismatch_level',
-    'num_of_matched_geneids',
-    'matched_geneid',
-    'num_of_matched_accessions',
-    'matched_accession'
     ]
-    df = df[new_column_order]
-
-    # Save the updated DataFrame to the output TSV
+    # One group of hit columns per reference, suffixed with its name when several were screened
+    for suffix in hit_column_suffixes(df.columns):
+        new_column_order += [
+            f'num_of_matched_geneids{suffix}',
+            f'matched_geneid{suffix}',
+            f'num_of_matched_accessions{suffix}',
+            f'matched_accession{suffix}'
+        ]
+    return df[new_column_order]
+
+def write_final_report(df, output_xlsx):
+    """Writes the final report DataFrame to an XLSX file."""
     try:
         df.to_excel(output_xlsx, index=False, engine='openpyxl')
     except Exception as e:
         print(f"Error saving file {output_xlsx}: {e}", file=sys.stderr)
         sys.exit(1)
 
-def main():
-    parser = argparse.ArgumentParser(description="Generate chemically-modified format of the oligos for production and emerge with the final TSV report.")
+def generate_final_report(report_tsv, sense_length, antisense_length, output_xlsx):
+    # Load the report TSV
+    df = read_table(report_tsv)
+
+    df = format_final_report(df, sense_length, antisense_length)
+
+    # Save the updated DataFrame to the output XLSX
+    write_final_report(df, output_xlsx)
+
+def add_arguments(parser):
     parser.add_argument("--report_tsv", required=True, help="Path to the input report TSV file.")
     parser.add_argument("--sense_length", type=int, default=14, help="Length of the sense strand.")
     parser.add_argument("--antisense_length", type=int, default=19, help="Length of the antisense strand.")
     parser.add_argument("--output_xlsx", required=True, help="Path to the output XLSX file.")
-    args = parser.parse_args()
 
+def main(args):
     generate_final_report(args.report_tsv, args.sense_length, args.antisense_length, args.output_xlsx)
-
-
-if __name__ == '__main__':
-    main()
\ No newline at end of file
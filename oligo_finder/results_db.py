@@ -0,0 +1,102 @@
+"""Schema and helpers of the run-level SQLite results database."""
+
+import json
+import sqlite3
+import sys
+
+# Merged table column -> (database column, type) of the one-row-per-oligo table
+OLIGO_COLUMNS = [
+    ('#ID', 'oligo_id', str),
+    ('Surrounding_Region', 'surrounding_region', str),
+    ('Oligo', 'oligo', str),
+    ('Region', 'region', str),
+    ('GC_Content', 'gc_content', float),
+    ('Refseq_Seed', 'refseq_seed', str),
+    ('MicroRNA_Hits', 'microrna_hits', int),
+    ('Score', 'score', float),
+    ('Target_Accessibility', 'target_accessibility', float),
+    ('Antisense_MFE', 'antisense_mfe', float),
+    ('Duplex_5_Prime_dG', 'duplex_5_prime_dg', float),
+    ('Duplex_3_Prime_dG', 'duplex_3_prime_dg', float),
+    ('Duplex_Asymmetry', 'duplex_asymmetry', float),
+]
+
+# Merged table column -> type of the one-row-per-oligo-reference-and-mismatch-level
+# table. The columns other than the mismatch level carry the reference suffix
+# in the merged tables of runs screening several references.
+HIT_COLUMNS = [
+    ('mismatch_level', int),
+    ('num_of_matched_geneids', int),
+    ('num_of_matched_accessions', int),
+    ('matched_geneid', str),
+    ('matched_accession', str),
+]
+
+SQL_TYPES = {str: 'TEXT', int: 'INTEGER', float: 'REAL'}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS run_metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS oligos (
+    gene_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    {', '.join(f'{column} {SQL_TYPES[kind]}' for _, column, kind in OLIGO_COLUMNS)},
+    PRIMARY KEY (oligo_id)
+);
+CREATE TABLE IF NOT EXISTS hits (
+    oligo_id TEXT NOT NULL,
+    reference TEXT NOT NULL,
+    {', '.join(f'{column} {SQL_TYPES[kind]}' for column, kind in HIT_COLUMNS)},
+    PRIMARY KEY (oligo_id, reference, mismatch_level)
+);
+"""
+
+# Created after the bulk load, which is much faster than maintaining them row by row
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_oligos_gene ON oligos (gene_id, position);
+CREATE INDEX IF NOT EXISTS idx_oligos_region ON oligos (region);
+CREATE INDEX IF NOT EXISTS idx_oligos_gc ON oligos (gc_content);
+CREATE INDEX IF NOT EXISTS idx_oligos_score ON oligos (score);
+CREATE INDEX IF NOT EXISTS idx_hits_offtargets ON hits (reference, mismatch_level, num_of_matched_geneids);
+"""
+
+def connect(db_path, must_exist=True):
+    """Opens the results database, exiting with an error if it does not exist."""
+    try:
+        if must_exist:
+            return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        return sqlite3.connect(db_path)
+    except sqlite3.Error as e:
+        print(f"Error opening results database {db_path}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def load_references(conn):
+    """
+    Returns the (reference, column suffix) pairs of the references in the
+    database, in the order they were screened. The hit columns are only
+    suffixed for runs given a --bowtie_indexes sheet.
+    """
+    references = [row[0] for row in conn.execute("SELECT DISTINCT reference FROM hits ORDER BY reference")]
+    metadata = {
+        key: json.loads(value) for key, value in
+        conn.execute("SELECT key, value FROM run_metadata WHERE key IN ('bowtie_indexes', 'references')")
+    }
+    order = metadata.get('references') or []
+    references.sort(key=lambda reference: order.index(reference) if reference in order else len(order))
+    suffixed = bool(metadata['bowtie_indexes']) if 'bowtie_indexes' in metadata else len(references) > 1
+    return [(reference, f"_{reference}" if suffixed else "") for reference in references]
+
+def split_oligo_id(oligo_id):
+    """Splits an oligo ID of the form '<gene_id>_<position>' into its gene ID and position."""
+    gene_id, position = oligo_id.rsplit('_', 1)
+    return gene_id, int(position)
+
+def convert(value, kind):
+    """Converts a TSV field to the given type, mapping empty fields and NaN to None."""
+    if value in ('', 'nan', 'NaN', None):
+        return None
+    if kind is int:
+        return int(float(value))
+    return kind(value)
@@ -0,0 +1,18 @@
+"""Shared sequence helpers for the oligo-finder commands."""
+
+COMPLEMENT = {'A': 'T', 'T': 'A', 'C': 'G', 'G': 'C', 'N': 'N'}
+
+def calculate_gc(seq):
+    """Calculates the GC content of a DNA sequence."""
+    if not seq:
+        return 0.0
+    gc_count = sum(base in ('G', 'C') for base in seq)
+    return (gc_count / len(seq)) * 100
+
+def reverse_complement(seq):
+    """Generates the reverse complement of a DNA sequence."""
+    return "".join(COMPLEMENT.get(base, base) for base in reversed(seq.upper()))
+
+def convert_dna_to_rna(seq):
+    """Converts a DNA sequence to an RNA sequence by replacing T with U."""
+    return seq.upper().replace('T', 'U')
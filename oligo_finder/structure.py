@@ -0,0 +1,131 @@
+"""Score the self-structure and duplex end stability of the unique oligos of a group of genes with ViennaRNA."""
+
+import csv
+import sys
+from multiprocessing import Pool
+
+from .io_utils import open_text
+from .seq_utils import convert_dna_to_rna, reverse_complement
+
+# Number of base pairs at each end of the guide/passenger duplex
+DUPLEX_END_LENGTH = 4
+
+STRUCTURE_COLUMNS = ['Antisense_MFE', 'Duplex_5_Prime_dG', 'Duplex_3_Prime_dG', 'Duplex_Asymmetry']
+
+def duplex_region(oligo_length, sense_length, antisense_length):
+    """
+    Returns the first and last oligo position paired in the guide/passenger
+    duplex. As in the synthesis formats, the sense strand starts at position
+    5 of the oligo and the antisense strand at position 1 of its reverse
+    complement.
+    """
+    first = max(5, oligo_length - 1 - antisense_length)
+    last = min(5 + sense_length - 1, oligo_length - 2)
+    if last - first + 1 < DUPLEX_END_LENGTH:
+        print(
+            f"Error: The sense and antisense strands pair over fewer than {DUPLEX_END_LENGTH} nt "
+            f"for oligos of length {oligo_length}.", file=sys.stderr
+        )
+        sys.exit(1)
+    return first, last
+
+def antisense_strand(oligo, antisense_length):
+    """Returns the RNA antisense (guide) strand of a DNA oligo."""
+    return convert_dna_to_rna(reverse_complement(oligo))[1:1 + antisense_length]
+
+def antisense_mfe(antisense):
+    """Minimum free energy (kcal/mol) of the antisense strand folding on itself."""
+    import RNA
+
+    _, mfe = RNA.fold(antisense)
+    return mfe
+
+def helix_energy(sense):
+    """Free energy (kcal/mol) of a short sense sequence paired with its perfect complement."""
+    import RNA
+
+    duplex = f"{sense}&{convert_dna_to_rna(reverse_complement(sense))}"
+    # The structure of a dimer is given without the strand separator
+    structure = '(' * len(sense) + ')' * len(sense)
+    return RNA.fold_compound(duplex).eval_structure(structure)
+
+def score_oligos(oligos, sense_length, antisense_length, threads=1, chunksize=256):
+    """
+    Scores each oligo, computing every unique antisense strand and duplex end
+    only once. The antisense folds are spread over a process pool; the duplex
+    ends are 4-mers, at most 256 of them, and are evaluated in this process.
+
+    Returns a dict oligo -> (Antisense_MFE, 5' dG, 3' dG, asymmetry), where the
+    ends are named after the antisense strand and the asymmetry is
+    5' dG - 3' dG (positive when the antisense 5' end is the less stable one).
+    """
+    antisenses = sorted({antisense_strand(oligo, antisense_length) for oligo in oligos})
+    if threads > 1 and len(antisenses) > chunksize:
+        with Pool(threads) as pool:
+            mfes = dict(zip(antisenses, pool.imap(antisense_mfe, antisenses, chunksize)))
+    else:
+        mfes = {antisense: antisense_mfe(antisense) for antisense in antisenses}
+
+    helix_energies = {}
+    scores = {}
+    for oligo in oligos:
+        if oligo in scores:
+            continue
+        first, last = duplex_region(len(oligo), sense_length, antisense_length)
+        ends = []
+        # The antisense 5' end pairs with the 3' end of the sense positions
+        for start in (last - DUPLEX_END_LENGTH + 1, first):
+            end = convert_dna_to_rna(oligo[start:start + DUPLEX_END_LENGTH])
+            if end not in helix_energies:
+                helix_energies[end] = helix_energy(end)
+            ends.append(helix_energies[end])
+        scores[oligo] = (mfes[antisense_strand(oligo, antisense_length)], ends[0], ends[1], ends[0] - ends[1])
+    return scores
+
+def replace_structure_columns(df, scores):
+    """
+    Sets the structure columns of a results DataFrame from a dict of scores
+    per oligo, replacing any existing ones. The columns follow the target
+    accessibility, as in the merged tables.
+    """
+    df = df.drop(columns=[column for column in STRUCTURE_COLUMNS if column in df.columns])
+    position = df.columns.get_loc('Target_Accessibility') + 1 if 'Target_Accessibility' in df.columns else len(df.columns)
+    for i, column in enumerate(STRUCTURE_COLUMNS):
+        df.insert(position + i, column, df['Oligo'].map(lambda oligo: scores[oligo][i] if oligo in scores else None))
+    return df
+
+def read_structure_scores(scores_path):
+    """Reads a structure scores table into a dict oligo -> scores, as score_oligos returns them."""
+    with open_text(scores_path, newline='') as f:
+        return {
+            row['Oligo']: tuple(float(row[column]) for column in STRUCTURE_COLUMNS)
+            for row in csv.DictReader(f, delimiter='\t')
+        }
+
+def calculate_structure(table_paths, output_path, sense_length, antisense_length, threads=1):
+    """
+    Writes the structure scores of the unique oligos of several tables (seqs
+    or merged), one row per oligo. Overlapping isoforms share most of their
+    windows, so each oligo of the group is scored once.
+    """
+    oligos = {}
+    for table_path in table_paths:
+        with open_text(table_path, newline='') as f:
+            oligos.update(dict.fromkeys(row['Oligo'] for row in csv.DictReader(f, delimiter='\t')))
+
+    scores = score_oligos(oligos, sense_length, antisense_length, threads)
+
+    with open_text(output_path, 'w') as f_out:
+        f_out.write('\t'.join(['Oligo'] + STRUCTURE_COLUMNS) + '\n')
+        for oligo in oligos:
+            f_out.write(oligo + ''.join(f"\t{value:.2f}" for value in scores[oligo]) + '\n')
+
+def add_arguments(parser):
+    parser.add_argument("--seqs", required=True, nargs='+', help="Sequence TSV files of a group of genes (see generate), or their merged tables.")
+    parser.add_argument("--output", required=True, help="Output structure scores TSV file, one row per unique oligo.")
+    parser.add_argument("--sense_length", type=int, default=14, help="Length of the sense strand.")
+    parser.add_argument("--antisense_length", type=int, default=19, help="Length of the antisense strand.")
+    parser.add_argument("--threads", type=int, default=1, help="Number of worker processes folding the antisense strands.")
+
+def main(args):
+    calculate_structure(args.seqs, args.output, args.sense_length, args.antisense_length, args.threads)
@@ -0,0 +1,18 @@
+"""Update the structure scores of a merged results table reused from a previous run."""
+
+from .io_utils import read_table, write_table
+from .structure import read_structure_scores, replace_structure_columns
+
+def update_merged_results(merged_path, oligo_structure_path, output_path):
+    """Writes a merged table with its structure columns replaced by the given structure scores."""
+    merged = read_table(merged_path)
+    merged = replace_structure_columns(merged, read_structure_scores(oligo_structure_path))
+    write_table(merged, output_path)
+
+def add_arguments(parser):
+    parser.add_argument("--merged", required=True, help="Path to the merged results TSV file of the previous run.")
+    parser.add_argument("--oligo_structure", required=True, help="Path to the oligo structure scores TSV file (see structure).")
+    parser.add_argument("--output", required=True, help="Path to the output merged TSV file.")
+
+def main(args):
+    update_merged_results(args.merged, args.oligo_structure, args.output)